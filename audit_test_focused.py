@@ -7,6 +7,7 @@ Tests specifically the audit logging functionality
 import requests
 import sys
 import json
+import time
 from datetime import datetime, date, timedelta
 from typing import Dict, Any, Optional
 
@@ -194,7 +195,6 @@ class AuditLoggingTester:
         print("\n🔍 Testing Audit Log Retrieval...")
         
         # Wait for audit logs to be created
-        import time
         time.sleep(3)
         
         # 1. Patient retrieves their own audit logs
@@ -4,14 +4,144 @@ HealthCard ID Backend API Testing Suite
 Tests all API endpoints for the health records management system
 """
 
+import argparse
+import io
+import os
 import requests
+from requests.adapters import HTTPAdapter
 import sys
-import json
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
+from test_utils import json_dumps, json_loads, use_cassette
+
+
+def _is_iso8601(value) -> bool:
+    """Return True if value is an ISO 8601 date/datetime string"""
+    # Checked before the cache so unhashable JSON values never reach it
+    return isinstance(value, str) and _is_iso8601_str(value)
+
+@lru_cache(maxsize=4096)
+def _is_iso8601_str(value: str) -> bool:
+    """Parse check behind _is_iso8601; the same timestamps recur across tests"""
+    try:
+        datetime.fromisoformat(value)  # Python 3.11+ also accepts a trailing 'Z'
+        return True
+    except ValueError:
+        try:
+            datetime.fromisoformat(value.replace('Z', '+00:00'))
+            return True
+        except ValueError:
+            return False
+
+# Recorded backend traffic for --replay/--record runs (requires vcrpy)
+CASSETTE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "cassettes", "healthcard.yaml")
+
+# Keys every API object of a given kind must carry
+_PROFILE_SECTIONS = frozenset(("patient_info", "medical_records", "prescriptions", "appointments", "uploaded_files", "stats"))
+_EXPECTED_PATIENT_FIELDS = frozenset(("id", "user_id", "name", "email"))
+_EXPECTED_STATS = frozenset(("total_records", "total_prescriptions", "total_appointments", "total_files"))
+_EXPECTED_AUDIT_LOG_FIELDS = frozenset(("user_id", "user_name", "user_role", "action", "resource_type",
+                                        "resource_id", "description", "created_at"))
+_EXPECTED_NOTIFICATION_FIELDS = frozenset(("id", "user_id", "type", "priority", "title", "message", "read", "created_at"))
+_EXPECTED_APPOINTMENT_METADATA = frozenset(("appointment_date", "appointment_time", "doctor_name", "appointment_type"))
+_EXPECTED_MULTI_PRESCRIPTION_FIELDS = frozenset(("id", "patient_id", "doctor_id", "medicines", "start_date",
+                                                 "general_instructions", "status", "created_at"))
+_EXPECTED_MEDICINE_FIELDS = frozenset(("name", "dosage", "frequency", "duration", "notes"))
+_DATETIME_FIELDS = ("created_at", "updated_at", "start_date")
+# (full-profile section, label) pairs whose items carry a created_at timestamp
+_PROFILE_TIMESTAMPED_SECTIONS = (("appointments", "appointment"), ("prescriptions", "prescription"),
+                                 ("medical_records", "medical_record"))
+
+# Fixed parts of request payloads; tests add patient_id and dates per run.
+# These are only ever read, so shallow {**template, ...} copies are safe.
+_APPOINTMENT_TEMPLATE = {
+    "appointment_time": "10:30",
+    "appointment_type": "consultation",
+    "reason": "Regular checkup",
+    "notes": "Test appointment for API testing"
+}
+
+_PRESCRIPTION_TEMPLATE = {
+    "medication_name": "Lisinopril",
+    "dosage": "10mg",
+    "frequency": "once daily",
+    "instructions": "Take with food in the morning",
+    "refills_remaining": 3
+}
+
+_MULTI_PRESCRIPTION_TEMPLATE = {
+    "general_instructions": "Take all medications as prescribed. Monitor for side effects.",
+    "medicines": [
+        {
+            "name": "Lisinopril",
+            "dosage": "10mg",
+            "frequency": "once daily",
+            "duration": "30 days",
+            "notes": "Take in the morning"
+        },
+        {
+            "name": "Metformin",
+            "dosage": "500mg",
+            "frequency": "twice daily",
+            "duration": "30 days",
+            "notes": "Take with meals"
+        },
+        {
+            "name": "Atorvastatin",
+            "dosage": "20mg",
+            "frequency": "once daily at bedtime",
+            "duration": "30 days",
+            "notes": "Take at night"
+        }
+    ]
+}
+
+_WORKFLOW_MULTI_PRESCRIPTION_TEMPLATE = {
+    "general_instructions": "Comprehensive treatment plan based on patient history and current condition. Monitor blood pressure and blood sugar levels.",
+    "medicines": [
+        {
+            "name": "Lisinopril",
+            "dosage": "10mg",
+            "frequency": "once daily in the morning",
+            "duration": "30 days",
+            "notes": "For blood pressure management. Take consistently at the same time."
+        },
+        {
+            "name": "Metformin",
+            "dosage": "500mg",
+            "frequency": "twice daily with meals",
+            "duration": "30 days",
+            "notes": "For diabetes management. Take with breakfast and dinner."
+        },
+        {
+            "name": "Atorvastatin",
+            "dosage": "20mg",
+            "frequency": "once daily at bedtime",
+            "duration": "30 days",
+            "notes": "For cholesterol management. Take at night for best effectiveness."
+        },
+        {
+            "name": "Aspirin",
+            "dosage": "81mg",
+            "frequency": "once daily",
+            "duration": "30 days",
+            "notes": "Low-dose for cardiovascular protection. Take with food."
+        }
+    ]
+}
+
 class HealthCardAPITester:
-    def __init__(self, base_url="https://bcd54ab1-eacf-4dd6-b947-589584660f93.preview.emergentagent.com"):
+    _VALID_PRIORITIES = frozenset({"low", "medium", "high", "urgent"})
+    _EXPECTED_AUDIT_TYPES = frozenset({"medical_record", "appointment", "prescription"})
+    _EXPECTED_NOTIF_TYPES = frozenset({"appointment_booked", "system_message"})  # Types we can trigger from tests
+
+    def __init__(self, base_url="https://bcd54ab1-eacf-4dd6-b947-589584660f93.preview.emergentagent.com",
+                 verbose=False):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.patient_token = None
@@ -21,24 +151,78 @@ class HealthCardAPITester:
         self.patient_id = None
         self.uploaded_file_id = None
         self.user_files = []
+        # One reference date for the whole run; tests offset from it rather than re-reading the clock
+        self._today_date = date.today()
+        self._today = self._today_date.isoformat()
         self.tests_run = 0
         self.tests_passed = 0
         self.test_results = []
+        # Output is buffered per test method and written once at the end of the run
+        # unless verbose; failures are also echoed to stderr as they happen
+        self._verbose = verbose
+        self._out = io.StringIO()
+        # Test lanes run on separate threads, so each thread keeps its own buffer
+        self._log_local = threading.local()
+        self._log_lock = threading.Lock()
+
+        # One pooled session for the whole suite so keep-alive connections are reused
+        self._session = requests.Session()
+        self._session.headers.update({"Accept": "application/json"})
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        # Small worker pool for independent requests that can overlap on the session above
+        self._pool = ThreadPoolExecutor(max_workers=4)
+
+    @property
+    def _log_buffer(self) -> list:
+        """Result lines buffered by the current thread"""
+        buffer = getattr(self._log_local, "buffer", None)
+        if buffer is None:
+            buffer = self._log_local.buffer = []
+        return buffer
+
+    def _emit(self, text: str):
+        """Queue a line of output with the current test method's results"""
+        if self._verbose:
+            sys.stdout.write(text + "\n")
+            sys.stdout.flush()
+        else:
+            self._log_buffer.append(text + "\n")
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test results"""
-        self.tests_run += 1
         if success:
-            self.tests_passed += 1
-            print(f"✅ {name} - PASSED")
+            line = f"✅ {name} - PASSED\n"
         else:
-            print(f"❌ {name} - FAILED: {details}")
-        
-        self.test_results.append({
-            "name": name,
-            "success": success,
-            "details": details
-        })
+            line = f"❌ {name} - FAILED: {details}\n"
+
+        with self._log_lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
+            self.test_results.append({
+                "name": name,
+                "success": success,
+                "details": details
+            })
+            if self._verbose:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+
+        if not self._verbose:
+            self._log_buffer.append(line)
+            if not success:
+                sys.stderr.write(line)
+                sys.stderr.flush()
+
+    def _flush_log(self):
+        """Move this thread's buffered lines into the run output as one block"""
+        buffer = self._log_buffer
+        if buffer:
+            with self._log_lock:
+                self._out.write("".join(buffer))
+            buffer.clear()
 
     def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
                     token: Optional[str] = None, expected_status: int = 200) -> tuple[bool, Dict]:
@@ -49,22 +233,17 @@ class HealthCardAPITester:
         if token:
             headers['Authorization'] = f'Bearer {token}'
 
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return False, {"error": f"Unsupported method: {method}"}
+
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
-            else:
-                return False, {"error": f"Unsupported method: {method}"}
+            body = json_dumps(data) if data is not None else None
+            response = self._session.request(method, url, data=body, headers=headers, timeout=30)
 
             success = response.status_code == expected_status
             
             try:
-                response_data = response.json()
+                response_data = json_loads(response.content)
             except:
                 response_data = {"raw_response": response.text, "status_code": response.status_code}
 
@@ -73,9 +252,50 @@ class HealthCardAPITester:
         except requests.exceptions.RequestException as e:
             return False, {"error": str(e)}
 
+    def _get_json(self, endpoint: str, token: Optional[str] = None,
+                  log_encoding: bool = False) -> tuple[bool, Dict]:
+        """Fast path for plain GETs that expect a 200 JSON response
+
+        log_encoding reports the response's Content-Encoding, for the list
+        endpoints whose payloads grow with history.
+        """
+        headers = {'Authorization': f'Bearer {token}'} if token else None
+        try:
+            response = self._session.get(f"{self.api_url}/{endpoint}", headers=headers, timeout=30)
+        except requests.exceptions.RequestException as e:
+            return False, {"error": str(e)}
+
+        if log_encoding:
+            encoding = response.headers.get("Content-Encoding") or "identity"
+            self._emit(f"   📦 GET {endpoint}: Content-Encoding {encoding}, {len(response.content)} bytes decoded")
+
+        try:
+            response_data = json_loads(response.content) if response.content else {}
+        except ValueError:
+            response_data = {"raw_response": response.text, "status_code": response.status_code}
+        return response.status_code == 200, response_data
+
+    def make_request_async(self, *args, **kwargs) -> Future:
+        """Submit make_request to the worker pool; call .result() for the (success, data) tuple"""
+        return self._pool.submit(self.make_request, *args, **kwargs)
+
+    def _validate_shape(self, name: str, obj: Dict, required: frozenset, label: str = "fields") -> bool:
+        """Log whether obj contains every required key and return the outcome"""
+        missing = sorted(required - obj.keys())
+        if missing:
+            self.log_test(name, False, f"Missing {label}: {missing}")
+        else:
+            self.log_test(name, True)
+        return not missing
+
+    def _run_setup_posts(self, specs):
+        """Issue independent (endpoint, data, token) POSTs concurrently, returning results in order"""
+        futures = [self.make_request_async("POST", *spec) for spec in specs]
+        return [future.result() for future in futures]
+
     def test_user_registration(self):
         """Test user registration for both patient and doctor"""
-        print("\n🔍 Testing User Registration...")
+        self._emit("\n🔍 Testing User Registration...")
         
         # Test patient registration
         timestamp = datetime.now().strftime("%H%M%S")
@@ -116,7 +336,7 @@ class HealthCardAPITester:
 
     def test_user_login(self):
         """Test user login functionality"""
-        print("\n🔍 Testing User Login...")
+        self._emit("\n🔍 Testing User Login...")
         
         if not self.patient_user or not self.doctor_user:
             self.log_test("Login Test Setup", False, "Users not registered")
@@ -150,14 +370,14 @@ class HealthCardAPITester:
 
     def test_patient_profile(self):
         """Test patient profile management"""
-        print("\n🔍 Testing Patient Profile Management...")
+        self._emit("\n🔍 Testing Patient Profile Management...")
         
         if not self.patient_token:
             self.log_test("Patient Profile Test Setup", False, "Patient not authenticated")
             return False
 
         # Get patient profile
-        success, response = self.make_request("GET", "patients/me", token=self.patient_token)
+        success, response = self._get_json("patients/me", token=self.patient_token)
         if success:
             self.patient_id = response.get("id")
             self.log_test("Get Patient Profile", True)
@@ -187,21 +407,21 @@ class HealthCardAPITester:
 
     def test_patient_search(self):
         """Test doctor's ability to search patients"""
-        print("\n🔍 Testing Patient Search...")
+        self._emit("\n🔍 Testing Patient Search...")
         
         if not self.doctor_token:
             self.log_test("Patient Search Test Setup", False, "Doctor not authenticated")
             return False
 
         # Search all patients
-        success, response = self.make_request("GET", "patients/search", token=self.doctor_token)
+        success, response = self._get_json("patients/search", token=self.doctor_token)
         if success and isinstance(response, list):
             self.log_test("Search All Patients", True)
         else:
             self.log_test("Search All Patients", False, str(response))
 
         # Search with query
-        success, response = self.make_request("GET", "patients/search?q=test", token=self.doctor_token)
+        success, response = self._get_json("patients/search?q=test", token=self.doctor_token)
         if success and isinstance(response, list):
             self.log_test("Search Patients with Query", True)
         else:
@@ -211,7 +431,7 @@ class HealthCardAPITester:
 
     def test_medical_records(self):
         """Test medical records CRUD operations"""
-        print("\n🔍 Testing Medical Records...")
+        self._emit("\n🔍 Testing Medical Records...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Medical Records Test Setup", False, "Required users not authenticated")
@@ -234,21 +454,21 @@ class HealthCardAPITester:
             self.log_test("Create Medical Record", False, str(response))
 
         # Get medical records (doctor view)
-        success, response = self.make_request("GET", "medical-records", token=self.doctor_token)
+        success, response = self._get_json("medical-records", token=self.doctor_token)
         if success and isinstance(response, list):
             self.log_test("Get Medical Records (Doctor)", True)
         else:
             self.log_test("Get Medical Records (Doctor)", False, str(response))
 
         # Get medical records (patient view)
-        success, response = self.make_request("GET", "medical-records", token=self.patient_token)
+        success, response = self._get_json("medical-records", token=self.patient_token)
         if success and isinstance(response, list):
             self.log_test("Get Medical Records (Patient)", True)
         else:
             self.log_test("Get Medical Records (Patient)", False, str(response))
 
         # Get patient-specific records
-        success, response = self.make_request("GET", f"medical-records/{self.patient_user['id']}", token=self.doctor_token)
+        success, response = self._get_json(f"medical-records/{self.patient_user['id']}", token=self.doctor_token)
         if success and isinstance(response, list):
             self.log_test("Get Patient-Specific Records", True)
         else:
@@ -258,11 +478,11 @@ class HealthCardAPITester:
 
     def test_dashboard_stats(self):
         """Test dashboard statistics"""
-        print("\n🔍 Testing Dashboard Statistics...")
+        self._emit("\n🔍 Testing Dashboard Statistics...")
         
         # Patient dashboard stats
         if self.patient_token:
-            success, response = self.make_request("GET", "dashboard/stats", token=self.patient_token)
+            success, response = self._get_json("dashboard/stats", token=self.patient_token)
             if success and "records_count" in response:
                 self.log_test("Patient Dashboard Stats", True)
             else:
@@ -270,7 +490,7 @@ class HealthCardAPITester:
 
         # Doctor dashboard stats
         if self.doctor_token:
-            success, response = self.make_request("GET", "dashboard/stats", token=self.doctor_token)
+            success, response = self._get_json("dashboard/stats", token=self.doctor_token)
             if success and "patients_count" in response:
                 self.log_test("Doctor Dashboard Stats", True)
             else:
@@ -280,14 +500,13 @@ class HealthCardAPITester:
 
     def test_file_upload_system(self):
         """Test comprehensive file upload system"""
-        print("\n🔍 Testing File Upload System...")
+        self._emit("\n🔍 Testing File Upload System...")
         
         if not self.patient_token:
             self.log_test("File Upload Test Setup", False, "Patient not authenticated")
             return False
 
         # Create test files in memory
-        import io
         
         # Test PDF file upload (medical report)
         pdf_content = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\nxref\n0 4\n0000000000 65535 f \n0000000009 00000 n \n0000000074 00000 n \n0000000120 00000 n \ntrailer\n<<\n/Size 4\n/Root 1 0 R\n>>\nstartxref\n179\n%%EOF"
@@ -295,14 +514,14 @@ class HealthCardAPITester:
         # Test medical report upload
         files = {'file': ('test_report.pdf', io.BytesIO(pdf_content), 'application/pdf')}
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.api_url}/upload/medical-report",
                 files=files,
                 headers={'Authorization': f'Bearer {self.patient_token}'},
                 timeout=30
             )
             if response.status_code == 200:
-                upload_response = response.json()
+                upload_response = json_loads(response.content)
                 if "file_id" in upload_response:
                     self.uploaded_file_id = upload_response["file_id"]
                     self.log_test("Medical Report Upload", True)
@@ -319,7 +538,7 @@ class HealthCardAPITester:
         
         files = {'file': ('test_profile.png', io.BytesIO(png_content), 'image/png')}
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.api_url}/upload/profile-image",
                 files=files,
                 headers={'Authorization': f'Bearer {self.patient_token}'},
@@ -336,14 +555,14 @@ class HealthCardAPITester:
 
     def test_file_management(self):
         """Test file management operations"""
-        print("\n🔍 Testing File Management...")
+        self._emit("\n🔍 Testing File Management...")
         
         if not self.patient_token:
             self.log_test("File Management Test Setup", False, "Patient not authenticated")
             return False
 
         # List user files
-        success, response = self.make_request("GET", "files", token=self.patient_token)
+        success, response = self._get_json("files", token=self.patient_token)
         if success and isinstance(response, list):
             self.log_test("List User Files", True)
             self.user_files = response
@@ -354,7 +573,7 @@ class HealthCardAPITester:
         # Test file download (if files exist)
         if hasattr(self, 'uploaded_file_id') and self.uploaded_file_id:
             try:
-                response = requests.get(
+                response = self._session.get(
                     f"{self.api_url}/files/{self.uploaded_file_id}",
                     headers={'Authorization': f'Bearer {self.patient_token}'},
                     timeout=30
@@ -379,7 +598,7 @@ class HealthCardAPITester:
 
     def test_file_security(self):
         """Test file access security"""
-        print("\n🔍 Testing File Security...")
+        self._emit("\n🔍 Testing File Security...")
         
         # Test unauthorized file access
         if hasattr(self, 'uploaded_file_id') and self.uploaded_file_id:
@@ -392,7 +611,7 @@ class HealthCardAPITester:
         # Test cross-user file access (if we have both users)
         if hasattr(self, 'uploaded_file_id') and self.uploaded_file_id and self.doctor_token:
             try:
-                response = requests.get(
+                response = self._session.get(
                     f"{self.api_url}/files/{self.uploaded_file_id}",
                     headers={'Authorization': f'Bearer {self.doctor_token}'},
                     timeout=30
@@ -409,7 +628,7 @@ class HealthCardAPITester:
 
     def test_ai_health_summary(self):
         """Test AI health summary generation"""
-        print("\n🔍 Testing AI Health Summary...")
+        self._emit("\n🔍 Testing AI Health Summary...")
         
         if not self.patient_token:
             self.log_test("AI Summary Test Setup", False, "Patient not authenticated")
@@ -439,23 +658,19 @@ class HealthCardAPITester:
 
     def test_appointments_management(self):
         """Test appointment management system"""
-        print("\n🔍 Testing Appointment Management...")
+        self._emit("\n🔍 Testing Appointment Management...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Appointment Test Setup", False, "Required users not authenticated")
             return False
 
         # Create appointment (doctor only)
-        from datetime import date, timedelta
-        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        tomorrow = (self._today_date + timedelta(days=1)).isoformat()
         
         appointment_data = {
+            **_APPOINTMENT_TEMPLATE,
             "patient_id": self.patient_user["id"],
-            "appointment_date": tomorrow,
-            "appointment_time": "10:30",
-            "appointment_type": "consultation",
-            "reason": "Regular checkup",
-            "notes": "Test appointment for API testing"
+            "appointment_date": tomorrow
         }
         
         success, response = self.make_request("POST", "appointments", appointment_data, token=self.doctor_token)
@@ -467,14 +682,14 @@ class HealthCardAPITester:
             self.log_test("Create Appointment", False, str(response))
 
         # Get appointments (doctor view)
-        success, response = self.make_request("GET", "appointments", token=self.doctor_token)
+        success, response = self._get_json("appointments", token=self.doctor_token)
         if success and isinstance(response, list):
             self.log_test("Get Appointments (Doctor)", True)
         else:
             self.log_test("Get Appointments (Doctor)", False, str(response))
 
         # Get appointments (patient view)
-        success, response = self.make_request("GET", "appointments", token=self.patient_token)
+        success, response = self._get_json("appointments", token=self.patient_token)
         if success and isinstance(response, list):
             self.log_test("Get Appointments (Patient)", True)
         else:
@@ -500,26 +715,21 @@ class HealthCardAPITester:
 
     def test_prescriptions_management(self):
         """Test prescription management system"""
-        print("\n🔍 Testing Prescription Management...")
+        self._emit("\n🔍 Testing Prescription Management...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Prescription Test Setup", False, "Required users not authenticated")
             return False
 
         # Create prescription (doctor only)
-        from datetime import date, timedelta
-        today = date.today().isoformat()
-        end_date = (date.today() + timedelta(days=30)).isoformat()
+        today = self._today
+        end_date = (self._today_date + timedelta(days=30)).isoformat()
         
         prescription_data = {
+            **_PRESCRIPTION_TEMPLATE,
             "patient_id": self.patient_user["id"],
-            "medication_name": "Lisinopril",
-            "dosage": "10mg",
-            "frequency": "once daily",
             "start_date": today,
-            "end_date": end_date,
-            "instructions": "Take with food in the morning",
-            "refills_remaining": 3
+            "end_date": end_date
         }
         
         success, response = self.make_request("POST", "prescriptions", prescription_data, token=self.doctor_token)
@@ -531,14 +741,14 @@ class HealthCardAPITester:
             self.log_test("Create Prescription", False, str(response))
 
         # Get prescriptions (doctor view)
-        success, response = self.make_request("GET", "prescriptions", token=self.doctor_token)
+        success, response = self._get_json("prescriptions", token=self.doctor_token)
         if success and isinstance(response, list):
             self.log_test("Get Prescriptions (Doctor)", True)
         else:
             self.log_test("Get Prescriptions (Doctor)", False, str(response))
 
         # Get prescriptions (patient view)
-        success, response = self.make_request("GET", "prescriptions", token=self.patient_token)
+        success, response = self._get_json("prescriptions", token=self.patient_token)
         if success and isinstance(response, list):
             self.log_test("Get Prescriptions (Patient)", True)
         else:
@@ -564,25 +774,20 @@ class HealthCardAPITester:
 
     def test_doctor_patient_portal(self):
         """Test enhanced doctor portal with full patient profiles"""
-        print("\n🔍 Testing Doctor Patient Portal...")
+        self._emit("\n🔍 Testing Doctor Patient Portal...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Doctor Portal Test Setup", False, "Required users not authenticated")
             return False
 
         # Get full patient profile
-        success, response = self.make_request("GET", f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
+        success, response = self._get_json(f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
         if success and "patient_info" in response:
             self.log_test("Get Full Patient Profile", True)
             
             # Check if all sections are present
-            expected_sections = ["patient_info", "medical_records", "prescriptions", "appointments", "uploaded_files", "stats"]
-            missing_sections = [section for section in expected_sections if section not in response]
-            
-            if not missing_sections:
-                self.log_test("Full Patient Profile Completeness", True)
-            else:
-                self.log_test("Full Patient Profile Completeness", False, f"Missing sections: {missing_sections}")
+            self._validate_shape("Full Patient Profile Completeness", response,
+                                 _PROFILE_SECTIONS, "sections")
         else:
             self.log_test("Get Full Patient Profile", False, str(response))
 
@@ -597,7 +802,7 @@ class HealthCardAPITester:
 
     def test_ai_chat(self):
         """Test AI chat functionality"""
-        print("\n🔍 Testing AI Chat...")
+        self._emit("\n🔍 Testing AI Chat...")
         
         # Test patient chat
         if self.patient_token:
@@ -628,7 +833,7 @@ class HealthCardAPITester:
 
         # Test chat history
         if self.patient_token:
-            success, response = self.make_request("GET", "chat/history", token=self.patient_token)
+            success, response = self._get_json("chat/history", token=self.patient_token)
             if success and isinstance(response, list):
                 self.log_test("Chat History", True)
             else:
@@ -638,7 +843,7 @@ class HealthCardAPITester:
 
     def test_audit_logging_system(self):
         """Test comprehensive audit logging system"""
-        print("\n🔍 Testing Audit Logging System...")
+        self._emit("\n🔍 Testing Audit Logging System...")
         
         if not self.doctor_token or not self.patient_token or not self.patient_user:
             self.log_test("Audit Logging Test Setup", False, "Required users not authenticated")
@@ -658,7 +863,11 @@ class HealthCardAPITester:
             self.log_test("Patient Profile Update (for audit)", False, str(response))
             return False
 
-        # Test 2: Doctor creates medical record (should create audit log)
+        # Tests 2-4: Doctor creates medical record, appointment and prescription (each should create an audit log)
+        tomorrow = (self._today_date + timedelta(days=2)).isoformat()
+        today = self._today
+        end_date = (self._today_date + timedelta(days=14)).isoformat()
+
         record_data = {
             "patient_id": self.patient_user["id"],
             "title": "Audit Test Medical Record",
@@ -666,16 +875,6 @@ class HealthCardAPITester:
             "record_type": "notes"
         }
         
-        success, response = self.make_request("POST", "medical-records", record_data, token=self.doctor_token)
-        if success:
-            self.log_test("Medical Record Creation (for audit)", True)
-        else:
-            self.log_test("Medical Record Creation (for audit)", False, str(response))
-
-        # Test 3: Doctor creates appointment (should create audit log)
-        from datetime import date, timedelta
-        tomorrow = (date.today() + timedelta(days=2)).isoformat()
-        
         appointment_data = {
             "patient_id": self.patient_user["id"],
             "appointment_date": tomorrow,
@@ -684,16 +883,6 @@ class HealthCardAPITester:
             "reason": "Audit logging test appointment"
         }
         
-        success, response = self.make_request("POST", "appointments", appointment_data, token=self.doctor_token)
-        if success:
-            self.log_test("Appointment Creation (for audit)", True)
-        else:
-            self.log_test("Appointment Creation (for audit)", False, str(response))
-
-        # Test 4: Doctor creates prescription (should create audit log)
-        today = date.today().isoformat()
-        end_date = (date.today() + timedelta(days=14)).isoformat()
-        
         prescription_data = {
             "patient_id": self.patient_user["id"],
             "medication_name": "Metformin",
@@ -703,34 +892,37 @@ class HealthCardAPITester:
             "end_date": end_date,
             "instructions": "Take with meals for audit test"
         }
-        
-        success, response = self.make_request("POST", "prescriptions", prescription_data, token=self.doctor_token)
-        if success:
-            self.log_test("Prescription Creation (for audit)", True)
-        else:
-            self.log_test("Prescription Creation (for audit)", False, str(response))
+
+        # The three creations are independent, so issue them together
+        setup_results = self._run_setup_posts([
+            ("medical-records", record_data, self.doctor_token),
+            ("appointments", appointment_data, self.doctor_token),
+            ("prescriptions", prescription_data, self.doctor_token),
+        ])
+        setup_names = [
+            "Medical Record Creation (for audit)",
+            "Appointment Creation (for audit)",
+            "Prescription Creation (for audit)",
+        ]
+        for name, (success, response) in zip(setup_names, setup_results):
+            if success:
+                self.log_test(name, True)
+            else:
+                self.log_test(name, False, str(response))
 
         # Wait a moment for audit logs to be created
-        import time
         time.sleep(2)
 
         # Test 5: Patient can retrieve their own audit logs
-        success, response = self.make_request("GET", "audit-logs", token=self.patient_token)
+        success, response = self._get_json("audit-logs", token=self.patient_token, log_encoding=True)
         if success and isinstance(response, list):
             patient_audit_logs = response
             self.log_test("Patient Audit Logs Retrieval", True)
             
             # Verify audit logs contain expected fields
             if patient_audit_logs:
-                log_entry = patient_audit_logs[0]
-                expected_fields = ["user_id", "user_name", "user_role", "action", "resource_type", 
-                                 "resource_id", "description", "created_at"]
-                missing_fields = [field for field in expected_fields if field not in log_entry]
-                
-                if not missing_fields:
-                    self.log_test("Audit Log Content Structure", True)
-                else:
-                    self.log_test("Audit Log Content Structure", False, f"Missing fields: {missing_fields}")
+                self._validate_shape("Audit Log Content Structure", patient_audit_logs[0],
+                                     _EXPECTED_AUDIT_LOG_FIELDS)
                 
                 # Check if patient profile update is logged
                 profile_updates = [log for log in patient_audit_logs if log.get("resource_type") == "patient_profile"]
@@ -751,7 +943,7 @@ class HealthCardAPITester:
             self.log_test("Patient Audit Logs Retrieval", False, str(response))
 
         # Test 6: Doctor can retrieve audit logs for their actions
-        success, response = self.make_request("GET", "audit-logs", token=self.doctor_token)
+        success, response = self._get_json("audit-logs", token=self.doctor_token)
         if success and isinstance(response, list):
             doctor_audit_logs = response
             self.log_test("Doctor Audit Logs Retrieval", True)
@@ -759,8 +951,7 @@ class HealthCardAPITester:
             # Check for different resource types in doctor logs
             if doctor_audit_logs:
                 resource_types = set(log.get("resource_type") for log in doctor_audit_logs)
-                expected_types = {"medical_record", "appointment", "prescription"}
-                found_types = resource_types.intersection(expected_types)
+                found_types = resource_types.intersection(self._EXPECTED_AUDIT_TYPES)
                 
                 if found_types:
                     self.log_test("Doctor Action Audit Logs", True)
@@ -772,29 +963,29 @@ class HealthCardAPITester:
             self.log_test("Doctor Audit Logs Retrieval", False, str(response))
 
         # Test 7: Get patient-specific audit logs (doctor only)
-        # First, get the patient ID from the patient profile
-        success, patient_profile = self.make_request("GET", "patients/me", token=self.patient_token)
-        if success and "id" in patient_profile:
-            patient_id = patient_profile["id"]
-            
-            success, response = self.make_request("GET", f"audit-logs/patient/{patient_id}", token=self.doctor_token)
+        # Patient profile ID was cached by test_patient_profile (it differs from the user ID)
+        patient_id = self.patient_id
+        if patient_id:
+            success, response = self._get_json(f"audit-logs/patient/{patient_id}", token=self.doctor_token)
             if success and "audit_logs" in response:
                 self.log_test("Patient-Specific Audit Logs (Doctor)", True)
                 
                 # Verify all logs are for this patient
                 patient_logs = response["audit_logs"]
                 if patient_logs:
-                    all_for_patient = all(log.get("patient_id") == patient_id for log in patient_logs if log.get("patient_id"))
-                    if all_for_patient:
+                    foreign_log = next((log for log in patient_logs
+                                        if log.get("patient_id") and log.get("patient_id") != patient_id), None)
+                    if foreign_log is None:
                         self.log_test("Patient-Specific Audit Log Filtering", True)
                     else:
-                        self.log_test("Patient-Specific Audit Log Filtering", False, "Found logs for other patients")
+                        self.log_test("Patient-Specific Audit Log Filtering", False,
+                                      f"Found logs for other patients (e.g. log {foreign_log.get('id')} for {foreign_log.get('patient_id')})")
                 else:
                     self.log_test("Patient-Specific Audit Log Filtering", True, "No logs found (acceptable)")
             else:
                 self.log_test("Patient-Specific Audit Logs (Doctor)", False, str(response))
         else:
-            self.log_test("Patient-Specific Audit Logs Setup", False, "Could not get patient ID")
+            self.log_test("Patient-Specific Audit Logs Setup", False, "Patient ID not cached from profile lookup")
 
         # Test 8: Patient cannot access doctor-only audit endpoints
         if patient_id:
@@ -806,15 +997,16 @@ class HealthCardAPITester:
                 self.log_test("Patient Audit Access Restriction", False, "Patient should not access doctor-only endpoints")
 
         # Test 9: Test audit log filtering by resource type
-        success, response = self.make_request("GET", "audit-logs?resource_type=appointment", token=self.doctor_token)
+        success, response = self._get_json("audit-logs?resource_type=appointment", token=self.doctor_token)
         if success and isinstance(response, list):
             appointment_logs = response
             if appointment_logs:
-                all_appointments = all(log.get("resource_type") == "appointment" for log in appointment_logs)
-                if all_appointments:
+                non_appointment_log = next((log for log in appointment_logs if log.get("resource_type") != "appointment"), None)
+                if non_appointment_log is None:
                     self.log_test("Audit Log Resource Type Filtering", True)
                 else:
-                    self.log_test("Audit Log Resource Type Filtering", False, "Found non-appointment logs")
+                    self.log_test("Audit Log Resource Type Filtering", False,
+                                  f"Found non-appointment logs (e.g. {non_appointment_log.get('resource_type')} log {non_appointment_log.get('id')})")
             else:
                 self.log_test("Audit Log Resource Type Filtering", True, "No appointment logs (acceptable)")
         else:
@@ -826,11 +1018,9 @@ class HealthCardAPITester:
             if "created_at" in log_with_datetime:
                 created_at = log_with_datetime["created_at"]
                 # Check if it's a valid ISO format string
-                try:
-                    from datetime import datetime
-                    datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                if _is_iso8601(created_at):
                     self.log_test("Audit Log Datetime Serialization", True)
-                except ValueError:
+                else:
                     self.log_test("Audit Log Datetime Serialization", False, f"Invalid datetime format: {created_at}")
             else:
                 self.log_test("Audit Log Datetime Serialization", False, "No created_at field found")
@@ -839,7 +1029,7 @@ class HealthCardAPITester:
 
     def test_notification_system(self):
         """Test comprehensive notification system"""
-        print("\n🔍 Testing Notification System...")
+        self._emit("\n🔍 Testing Notification System...")
         
         if not self.doctor_token or not self.patient_token or not self.patient_user:
             self.log_test("Notification System Test Setup", False, "Required users not authenticated")
@@ -853,28 +1043,22 @@ class HealthCardAPITester:
             self.log_test("Create Test Notification", False, str(response))
 
         # Test 2: Get notifications for patient
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
+        success, response = self._get_json("notifications", token=self.patient_token, log_encoding=True)
         if success and isinstance(response, list):
             patient_notifications = response
             self.log_test("Get Patient Notifications", True)
             
             # Verify notification structure
             if patient_notifications:
-                notification = patient_notifications[0]
-                expected_fields = ["id", "user_id", "type", "priority", "title", "message", "read", "created_at"]
-                missing_fields = [field for field in expected_fields if field not in notification]
-                
-                if not missing_fields:
-                    self.log_test("Notification Structure Validation", True)
-                else:
-                    self.log_test("Notification Structure Validation", False, f"Missing fields: {missing_fields}")
+                self._validate_shape("Notification Structure Validation", patient_notifications[0],
+                                     _EXPECTED_NOTIFICATION_FIELDS)
             else:
                 self.log_test("Notification Structure Validation", True, "No notifications to validate (acceptable)")
         else:
             self.log_test("Get Patient Notifications", False, str(response))
 
         # Test 3: Get unread notification count
-        success, response = self.make_request("GET", "notifications/unread-count", token=self.patient_token)
+        success, response = self._get_json("notifications/unread-count", token=self.patient_token)
         if success and "unread_count" in response:
             unread_count = response["unread_count"]
             self.log_test("Get Unread Notification Count", True)
@@ -888,8 +1072,7 @@ class HealthCardAPITester:
             self.log_test("Get Unread Notification Count", False, str(response))
 
         # Test 4: Create appointment to trigger automatic notification
-        from datetime import date, timedelta
-        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        tomorrow = (self._today_date + timedelta(days=1)).isoformat()
         
         appointment_data = {
             "patient_id": self.patient_user["id"],
@@ -906,11 +1089,10 @@ class HealthCardAPITester:
             self.log_test("Create Appointment (for notification)", True)
             
             # Wait a moment for notification to be created
-            import time
             time.sleep(2)
             
             # Check if appointment notification was created
-            success, response = self.make_request("GET", "notifications", token=self.patient_token)
+            success, response = self._get_json("notifications", token=self.patient_token)
             if success and isinstance(response, list):
                 appointment_notifications = [n for n in response if n.get("type") == "appointment_booked"]
                 if appointment_notifications:
@@ -919,14 +1101,8 @@ class HealthCardAPITester:
                     # Verify notification metadata
                     appt_notification = appointment_notifications[0]
                     if "metadata" in appt_notification and appt_notification["metadata"]:
-                        metadata = appt_notification["metadata"]
-                        expected_metadata = ["appointment_date", "appointment_time", "doctor_name", "appointment_type"]
-                        missing_metadata = [field for field in expected_metadata if field not in metadata]
-                        
-                        if not missing_metadata:
-                            self.log_test("Appointment Notification Metadata", True)
-                        else:
-                            self.log_test("Appointment Notification Metadata", False, f"Missing metadata: {missing_metadata}")
+                        self._validate_shape("Appointment Notification Metadata", appt_notification["metadata"],
+                                             _EXPECTED_APPOINTMENT_METADATA, "metadata")
                     else:
                         self.log_test("Appointment Notification Metadata", False, "No metadata found")
                 else:
@@ -937,7 +1113,7 @@ class HealthCardAPITester:
             self.log_test("Create Appointment (for notification)", False, str(response))
 
         # Test 5: Mark notification as read
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
+        success, response = self._get_json("notifications", token=self.patient_token)
         if success and isinstance(response, list) and response:
             notification_to_mark = response[0]
             notification_id = notification_to_mark["id"]
@@ -946,11 +1122,14 @@ class HealthCardAPITester:
             if success and response.get("success"):
                 self.log_test("Mark Notification as Read", True)
                 
-                # Verify notification is marked as read
-                success, response = self.make_request("GET", "notifications", token=self.patient_token)
+                # Verify notification is marked as read. The PUT only returns {"success": true}
+                # and there is no single-notification GET, so look it up in the full list
+                success, response = self._get_json("notifications", token=self.patient_token)
                 if success and isinstance(response, list):
-                    updated_notification = next((n for n in response if n["id"] == notification_id), None)
-                    if updated_notification and updated_notification.get("read") == True:
+                    updated_notification = next((n for n in response if n.get("id") == notification_id), None)
+                    if updated_notification is None:
+                        self.log_test("Notification Read Status Update", False, "Notification missing from list")
+                    elif updated_notification.get("read") is True:
                         self.log_test("Notification Read Status Update", True)
                     else:
                         self.log_test("Notification Read Status Update", False, "Notification not marked as read")
@@ -967,7 +1146,7 @@ class HealthCardAPITester:
             self.log_test("Mark All Notifications as Read", True)
             
             # Verify unread count is now 0
-            success, response = self.make_request("GET", "notifications/unread-count", token=self.patient_token)
+            success, response = self._get_json("notifications/unread-count", token=self.patient_token)
             if success and response.get("unread_count") == 0:
                 self.log_test("Mark All Read Verification", True)
             else:
@@ -976,7 +1155,7 @@ class HealthCardAPITester:
             self.log_test("Mark All Notifications as Read", False, str(response))
 
         # Test 7: Delete notification
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
+        success, response = self._get_json("notifications", token=self.patient_token)
         if success and isinstance(response, list) and response:
             notification_to_delete = response[0]
             notification_id = notification_to_delete["id"]
@@ -986,7 +1165,7 @@ class HealthCardAPITester:
                 self.log_test("Delete Notification", True)
                 
                 # Verify notification is deleted
-                success, response = self.make_request("GET", "notifications", token=self.patient_token)
+                success, response = self._get_json("notifications", token=self.patient_token)
                 if success and isinstance(response, list):
                     deleted_notification = next((n for n in response if n["id"] == notification_id), None)
                     if not deleted_notification:
@@ -1005,7 +1184,7 @@ class HealthCardAPITester:
         success, response = self.make_request("POST", "notifications/test", token=self.doctor_token)
         if success:
             # Patient should not see doctor's notifications
-            success, response = self.make_request("GET", "notifications", token=self.patient_token)
+            success, response = self._get_json("notifications", token=self.patient_token)
             if success and isinstance(response, list):
                 doctor_notifications_in_patient_view = [n for n in response if n.get("user_id") == self.doctor_user["id"]]
                 if not doctor_notifications_in_patient_view:
@@ -1017,12 +1196,14 @@ class HealthCardAPITester:
         else:
             self.log_test("Role-Based Notification Access Control", False, "Could not create doctor notification")
 
+        # Tests 9-10 only read the patient's notifications, so fetch the list once for both
+        notifications_success, notifications_response = self._get_json("notifications", token=self.patient_token)
+
         # Test 9: Test notification priority levels
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
+        success, response = notifications_success, notifications_response
         if success and isinstance(response, list) and response:
             # Check if notifications have valid priority levels
-            valid_priorities = ["low", "medium", "high", "urgent"]
-            notifications_with_priority = [n for n in response if n.get("priority") in valid_priorities]
+            notifications_with_priority = [n for n in response if n.get("priority") in self._VALID_PRIORITIES]
             
             if notifications_with_priority:
                 self.log_test("Notification Priority Levels", True)
@@ -1032,7 +1213,7 @@ class HealthCardAPITester:
             self.log_test("Notification Priority Levels", True, "No notifications to check priority (acceptable)")
 
         # Test 10: Test notification content quality
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
+        success, response = notifications_success, notifications_response
         if success and isinstance(response, list) and response:
             # Check if notifications have meaningful titles and messages
             notifications_with_content = [n for n in response if n.get("title") and n.get("message") and 
@@ -1055,7 +1236,7 @@ class HealthCardAPITester:
         # Test 12: Test cross-user notification access
         if appointment_id:
             # Try to access patient's notifications with doctor token (should only see doctor's own)
-            success, response = self.make_request("GET", "notifications", token=self.doctor_token)
+            success, response = self._get_json("notifications", token=self.doctor_token)
             if success and isinstance(response, list):
                 patient_notifications_in_doctor_view = [n for n in response if n.get("user_id") == self.patient_user["id"]]
                 if not patient_notifications_in_doctor_view:
@@ -1069,15 +1250,14 @@ class HealthCardAPITester:
 
     def test_notification_scheduling_system(self):
         """Test notification scheduling and background tasks"""
-        print("\n🔍 Testing Notification Scheduling System...")
+        self._emit("\n🔍 Testing Notification Scheduling System...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Notification Scheduling Test Setup", False, "Required users not authenticated")
             return False
 
         # Test appointment reminder scheduling
-        from datetime import date, timedelta
-        future_date = (date.today() + timedelta(days=2)).isoformat()  # 2 days from now
+        future_date = (self._today_date + timedelta(days=2)).isoformat()  # 2 days from now
         
         appointment_data = {
             "patient_id": self.patient_user["id"],
@@ -1093,13 +1273,12 @@ class HealthCardAPITester:
             self.log_test("Create Future Appointment (for reminder)", True)
             
             # Wait a moment for background task to process
-            import time
             time.sleep(3)
             
             # Check if reminder notification was scheduled (it should be in the database but not sent yet)
             # We can't directly test the scheduled notification without waiting 24 hours,
             # but we can verify the appointment creation triggered the scheduling logic
-            success, response = self.make_request("GET", "notifications", token=self.patient_token)
+            success, response = self._get_json("notifications", token=self.patient_token)
             if success and isinstance(response, list):
                 # Look for appointment_booked notification (immediate) - this confirms the system is working
                 immediate_notifications = [n for n in response if n.get("type") == "appointment_booked"]
@@ -1120,11 +1299,10 @@ class HealthCardAPITester:
             self.log_test("Create Future Appointment (for reminder)", False, str(response))
 
         # Test notification type variety
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
+        success, response = self._get_json("notifications", token=self.patient_token)
         if success and isinstance(response, list) and response:
             notification_types = set(n.get("type") for n in response)
-            expected_types = {"appointment_booked", "system_message"}  # Types we can test
-            found_expected = notification_types.intersection(expected_types)
+            found_expected = notification_types.intersection(self._EXPECTED_NOTIF_TYPES)
             
             if found_expected:
                 self.log_test("Notification Type Variety", True)
@@ -1137,15 +1315,14 @@ class HealthCardAPITester:
 
     def test_mock_email_notification_system(self):
         """Test mock email notification system"""
-        print("\n🔍 Testing Mock Email Notification System...")
+        self._emit("\n🔍 Testing Mock Email Notification System...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Mock Email Test Setup", False, "Required users not authenticated")
             return False
 
         # Create an appointment which should trigger both in-app and email notifications
-        from datetime import date, timedelta
-        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        tomorrow = (self._today_date + timedelta(days=1)).isoformat()
         
         appointment_data = {
             "patient_id": self.patient_user["id"],
@@ -1164,11 +1341,10 @@ class HealthCardAPITester:
             # creation was successful, which means the email notification logic ran
             
             # Wait a moment for all notifications to be processed
-            import time
             time.sleep(2)
             
             # Verify the appointment was created successfully (indicates email system didn't break the flow)
-            success, response = self.make_request("GET", f"appointments/{response['id']}", token=self.doctor_token)
+            success, response = self._get_json(f"appointments/{response['id']}", token=self.doctor_token)
             if success and "id" in response:
                 self.log_test("Mock Email System Integration", True)
             else:
@@ -1188,43 +1364,19 @@ class HealthCardAPITester:
 
     def test_multi_medicine_prescriptions(self):
         """Test multi-medicine prescription creation and management"""
-        print("\n🔍 Testing Multi-Medicine Prescriptions...")
+        self._emit("\n🔍 Testing Multi-Medicine Prescriptions...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Multi-Prescription Test Setup", False, "Required users not authenticated")
             return False
 
         # Test 1: Create multi-medicine prescription
-        from datetime import date, timedelta
-        today = date.today().isoformat()
+        today = self._today
         
         multi_prescription_data = {
+            **_MULTI_PRESCRIPTION_TEMPLATE,
             "patient_id": self.patient_user["id"],
-            "start_date": today,
-            "general_instructions": "Take all medications as prescribed. Monitor for side effects.",
-            "medicines": [
-                {
-                    "name": "Lisinopril",
-                    "dosage": "10mg",
-                    "frequency": "once daily",
-                    "duration": "30 days",
-                    "notes": "Take in the morning"
-                },
-                {
-                    "name": "Metformin",
-                    "dosage": "500mg",
-                    "frequency": "twice daily",
-                    "duration": "30 days",
-                    "notes": "Take with meals"
-                },
-                {
-                    "name": "Atorvastatin",
-                    "dosage": "20mg",
-                    "frequency": "once daily at bedtime",
-                    "duration": "30 days",
-                    "notes": "Take at night"
-                }
-            ]
+            "start_date": today
         }
         
         success, response = self.make_request("POST", "multi-prescriptions", multi_prescription_data, token=self.doctor_token)
@@ -1234,13 +1386,8 @@ class HealthCardAPITester:
             self.log_test("Create Multi-Medicine Prescription", True)
             
             # Verify the response structure
-            expected_fields = ["id", "patient_id", "doctor_id", "medicines", "start_date", "general_instructions", "status", "created_at"]
-            missing_fields = [field for field in expected_fields if field not in response]
-            
-            if not missing_fields:
-                self.log_test("Multi-Prescription Response Structure", True)
-            else:
-                self.log_test("Multi-Prescription Response Structure", False, f"Missing fields: {missing_fields}")
+            self._validate_shape("Multi-Prescription Response Structure", response,
+                                 _EXPECTED_MULTI_PRESCRIPTION_FIELDS)
             
             # Verify medicines array structure
             if "medicines" in response and isinstance(response["medicines"], list):
@@ -1248,14 +1395,8 @@ class HealthCardAPITester:
                     self.log_test("Multi-Prescription Medicine Count", True)
                     
                     # Check medicine structure
-                    medicine = response["medicines"][0]
-                    expected_medicine_fields = ["name", "dosage", "frequency", "duration", "notes"]
-                    missing_medicine_fields = [field for field in expected_medicine_fields if field not in medicine]
-                    
-                    if not missing_medicine_fields:
-                        self.log_test("Medicine Structure Validation", True)
-                    else:
-                        self.log_test("Medicine Structure Validation", False, f"Missing medicine fields: {missing_medicine_fields}")
+                    self._validate_shape("Medicine Structure Validation", response["medicines"][0],
+                                         _EXPECTED_MEDICINE_FIELDS, "medicine fields")
                 else:
                     self.log_test("Multi-Prescription Medicine Count", False, f"Expected 3 medicines, got {len(response['medicines'])}")
             else:
@@ -1264,13 +1405,18 @@ class HealthCardAPITester:
             self.log_test("Create Multi-Medicine Prescription", False, str(response))
             return False
 
+        # Tests 2 and 3 are independent reads, so fetch both views concurrently
+        doctor_view = self._pool.submit(self._get_json, "multi-prescriptions", token=self.doctor_token)
+        patient_view = self._pool.submit(self._get_json, "multi-prescriptions", token=self.patient_token)
+
         # Test 2: Get multi-medicine prescriptions (doctor view)
-        success, response = self.make_request("GET", "multi-prescriptions", token=self.doctor_token)
+        success, response = doctor_view.result()
         if success and isinstance(response, list):
             self.log_test("Get Multi-Prescriptions (Doctor)", True)
             
             # Find our created prescription
-            our_prescription = next((p for p in response if p.get("id") == multi_prescription_id), None)
+            prescriptions_by_id = {p.get("id"): p for p in response if isinstance(p, dict)}
+            our_prescription = prescriptions_by_id.get(multi_prescription_id)
             if our_prescription:
                 self.log_test("Multi-Prescription Retrieval Verification", True)
                 
@@ -1285,12 +1431,13 @@ class HealthCardAPITester:
             self.log_test("Get Multi-Prescriptions (Doctor)", False, str(response))
 
         # Test 3: Get multi-medicine prescriptions (patient view)
-        success, response = self.make_request("GET", "multi-prescriptions", token=self.patient_token)
+        success, response = patient_view.result()
         if success and isinstance(response, list):
             self.log_test("Get Multi-Prescriptions (Patient)", True)
             
             # Find our created prescription
-            our_prescription = next((p for p in response if p.get("id") == multi_prescription_id), None)
+            prescriptions_by_id = {p.get("id"): p for p in response if isinstance(p, dict)}
+            our_prescription = prescriptions_by_id.get(multi_prescription_id)
             if our_prescription:
                 self.log_test("Patient Multi-Prescription Access", True)
                 
@@ -1306,29 +1453,15 @@ class HealthCardAPITester:
 
         # Test 4: Test data serialization (check for JSON serialization issues)
         if multi_prescription_id:
-            success, response = self.make_request("GET", "multi-prescriptions", token=self.doctor_token)
+            success, response = self._get_json("multi-prescriptions", token=self.doctor_token)
             if success and isinstance(response, list):
                 # Check if datetime fields are properly serialized
-                our_prescription = next((p for p in response if p.get("id") == multi_prescription_id), None)
+                prescriptions_by_id = {p.get("id"): p for p in response if isinstance(p, dict)}
+                our_prescription = prescriptions_by_id.get(multi_prescription_id)
                 if our_prescription:
-                    datetime_fields = ["created_at", "updated_at", "start_date"]
-                    serialization_issues = []
-                    
-                    for field in datetime_fields:
-                        if field in our_prescription:
-                            value = our_prescription[field]
-                            if isinstance(value, str):
-                                # Try to parse as ISO format
-                                try:
-                                    from datetime import datetime
-                                    if field == "start_date":
-                                        # start_date is just a date string
-                                        datetime.fromisoformat(value)
-                                    else:
-                                        # created_at and updated_at are datetime strings
-                                        datetime.fromisoformat(value.replace('Z', '+00:00'))
-                                except ValueError:
-                                    serialization_issues.append(f"{field}: {value}")
+                    serialization_issues = [f"{field}: {our_prescription[field]}" for field in _DATETIME_FIELDS
+                                            if isinstance(our_prescription.get(field), str)
+                                            and not _is_iso8601(our_prescription[field])]
                     
                     if not serialization_issues:
                         self.log_test("Multi-Prescription Datetime Serialization", True)
@@ -1364,7 +1497,7 @@ class HealthCardAPITester:
 
     def test_patient_profile_endpoint(self):
         """Test patient profile retrieval endpoint (GET /api/patients/{patient_id}/profile)"""
-        print("\n🔍 Testing Patient Profile Endpoint...")
+        self._emit("\n🔍 Testing Patient Profile Endpoint...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Patient Profile Endpoint Test Setup", False, "Required users not authenticated")
@@ -1374,36 +1507,21 @@ class HealthCardAPITester:
         # Testing this endpoint as it provides comprehensive patient data
         
         # Test 1: Get patient full profile (doctor access)
-        success, response = self.make_request("GET", f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
+        success, response = self._get_json(f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
         if success and isinstance(response, dict):
             self.log_test("Get Patient Full Profile (Doctor)", True)
+            full_profile = response
             
             # Verify response structure
-            expected_sections = ["patient_info", "medical_records", "prescriptions", "appointments", "uploaded_files", "stats"]
-            missing_sections = [section for section in expected_sections if section not in response]
-            
-            if not missing_sections:
-                self.log_test("Patient Profile Response Structure", True)
-                
+            if self._validate_shape("Patient Profile Response Structure", response,
+                                    _PROFILE_SECTIONS, "sections"):
                 # Test patient_info section
-                patient_info = response.get("patient_info", {})
-                expected_patient_fields = ["id", "user_id", "name", "email"]
-                missing_patient_fields = [field for field in expected_patient_fields if field not in patient_info]
-                
-                if not missing_patient_fields:
-                    self.log_test("Patient Info Section Structure", True)
-                else:
-                    self.log_test("Patient Info Section Structure", False, f"Missing patient info fields: {missing_patient_fields}")
+                self._validate_shape("Patient Info Section Structure", response.get("patient_info", {}),
+                                     _EXPECTED_PATIENT_FIELDS, "patient info fields")
                 
                 # Test stats section
-                stats = response.get("stats", {})
-                expected_stats = ["total_records", "total_prescriptions", "total_appointments", "total_files"]
-                missing_stats = [stat for stat in expected_stats if stat not in stats]
-                
-                if not missing_stats:
-                    self.log_test("Patient Profile Stats Section", True)
-                else:
-                    self.log_test("Patient Profile Stats Section", False, f"Missing stats: {missing_stats}")
+                self._validate_shape("Patient Profile Stats Section", response.get("stats", {}),
+                                     _EXPECTED_STATS, "stats")
                 
                 # Verify data types
                 if (isinstance(response.get("medical_records"), list) and
@@ -1413,9 +1531,6 @@ class HealthCardAPITester:
                     self.log_test("Patient Profile Data Types", True)
                 else:
                     self.log_test("Patient Profile Data Types", False, "Invalid data types in response sections")
-                
-            else:
-                self.log_test("Patient Profile Response Structure", False, f"Missing sections: {missing_sections}")
         else:
             self.log_test("Get Patient Full Profile (Doctor)", False, str(response))
             return False
@@ -1442,66 +1557,38 @@ class HealthCardAPITester:
         else:
             self.log_test("Non-Existent Patient Profile Handling", False, "Should return 404 for non-existent patient")
 
-        # Test 5: Test data serialization in patient profile
-        success, response = self.make_request("GET", f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
-        if success and isinstance(response, dict):
-            # Check for datetime serialization issues in all sections
-            serialization_issues = []
-            
-            # Check appointments for datetime fields
-            appointments = response.get("appointments", [])
-            for appointment in appointments:
-                if "created_at" in appointment:
-                    try:
-                        from datetime import datetime
-                        datetime.fromisoformat(appointment["created_at"].replace('Z', '+00:00'))
-                    except ValueError:
-                        serialization_issues.append(f"appointment created_at: {appointment['created_at']}")
-            
-            # Check prescriptions for datetime fields
-            prescriptions = response.get("prescriptions", [])
-            for prescription in prescriptions:
-                if "created_at" in prescription:
-                    try:
-                        from datetime import datetime
-                        datetime.fromisoformat(prescription["created_at"].replace('Z', '+00:00'))
-                    except ValueError:
-                        serialization_issues.append(f"prescription created_at: {prescription['created_at']}")
-            
-            # Check medical records for datetime fields
-            medical_records = response.get("medical_records", [])
-            for record in medical_records:
-                if "created_at" in record:
-                    try:
-                        from datetime import datetime
-                        datetime.fromisoformat(record["created_at"].replace('Z', '+00:00'))
-                    except ValueError:
-                        serialization_issues.append(f"medical_record created_at: {record['created_at']}")
-            
-            if not serialization_issues:
-                self.log_test("Patient Profile Datetime Serialization", True)
-            else:
-                self.log_test("Patient Profile Datetime Serialization", False, f"Serialization issues: {serialization_issues}")
+        # Test 5: Test data serialization in patient profile (reuses the Test 1 response)
+        # Only the created_at field of each timestamped section item is inspected
+        serialization_issues = [
+            f"{label} created_at: {item['created_at']}"
+            for section, label in _PROFILE_TIMESTAMPED_SECTIONS
+            for item in full_profile.get(section, [])
+            if "created_at" in item and not _is_iso8601(item["created_at"])
+        ]
+        
+        if not serialization_issues:
+            self.log_test("Patient Profile Datetime Serialization", True)
         else:
-            self.log_test("Patient Profile Datetime Serialization", False, "Could not retrieve patient profile for serialization test")
+            self.log_test("Patient Profile Datetime Serialization", False, f"Serialization issues: {serialization_issues}")
 
         return True
 
     def test_integration_doctor_workflow(self):
         """Test complete doctor workflow: search patient → view patient details → see records → create multi-prescription"""
-        print("\n🔍 Testing Integration Doctor Workflow...")
+        self._emit("\n🔍 Testing Integration Doctor Workflow...")
         
         if not self.doctor_token or not self.patient_user:
             self.log_test("Doctor Workflow Test Setup", False, "Required users not authenticated")
             return False
 
         # Step 1: Doctor searches for patients
-        success, response = self.make_request("GET", f"patients/search?q={self.patient_user['name']}", token=self.doctor_token)
+        success, response = self._get_json(f"patients/search?q={self.patient_user['name']}", token=self.doctor_token)
         if success and isinstance(response, list):
             self.log_test("Workflow Step 1: Patient Search", True)
             
             # Find our test patient
-            found_patient = next((p for p in response if p.get("user_id") == self.patient_user["id"]), None)
+            patients_by_user_id = {p.get("user_id"): p for p in response if isinstance(p, dict)}
+            found_patient = patients_by_user_id.get(self.patient_user["id"])
             if found_patient:
                 self.log_test("Workflow Step 1a: Patient Found in Search", True)
                 patient_data = found_patient
@@ -1513,7 +1600,7 @@ class HealthCardAPITester:
             return False
 
         # Step 2: Doctor views patient details
-        success, response = self.make_request("GET", f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
+        success, response = self._get_json(f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
         if success and isinstance(response, dict):
             self.log_test("Workflow Step 2: View Patient Details", True)
             patient_profile = response
@@ -1539,44 +1626,13 @@ class HealthCardAPITester:
                      f"Found {existing_records_count} records, {existing_prescriptions_count} prescriptions, {existing_appointments_count} appointments")
 
         # Step 4: Doctor creates a multi-medicine prescription based on patient data
-        from datetime import date
-        today = date.today().isoformat()
+        today = self._today
         
         # Create a comprehensive multi-prescription
         multi_prescription_data = {
+            **_WORKFLOW_MULTI_PRESCRIPTION_TEMPLATE,
             "patient_id": self.patient_user["id"],
-            "start_date": today,
-            "general_instructions": "Comprehensive treatment plan based on patient history and current condition. Monitor blood pressure and blood sugar levels.",
-            "medicines": [
-                {
-                    "name": "Lisinopril",
-                    "dosage": "10mg",
-                    "frequency": "once daily in the morning",
-                    "duration": "30 days",
-                    "notes": "For blood pressure management. Take consistently at the same time."
-                },
-                {
-                    "name": "Metformin",
-                    "dosage": "500mg",
-                    "frequency": "twice daily with meals",
-                    "duration": "30 days",
-                    "notes": "For diabetes management. Take with breakfast and dinner."
-                },
-                {
-                    "name": "Atorvastatin",
-                    "dosage": "20mg",
-                    "frequency": "once daily at bedtime",
-                    "duration": "30 days",
-                    "notes": "For cholesterol management. Take at night for best effectiveness."
-                },
-                {
-                    "name": "Aspirin",
-                    "dosage": "81mg",
-                    "frequency": "once daily",
-                    "duration": "30 days",
-                    "notes": "Low-dose for cardiovascular protection. Take with food."
-                }
-            ]
+            "start_date": today
         }
         
         success, response = self.make_request("POST", "multi-prescriptions", multi_prescription_data, token=self.doctor_token)
@@ -1593,40 +1649,38 @@ class HealthCardAPITester:
             self.log_test("Workflow Step 4: Create Multi-Prescription", False, str(response))
             return False
 
-        # Step 5: Verify the workflow completed successfully by checking updated patient profile
-        success, response = self.make_request("GET", f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
-        if success and isinstance(response, dict):
-            updated_prescriptions_count = len(response.get("prescriptions", []))
+        # Step 5: Verify the workflow completed successfully
+        # Multi-prescriptions are stored separately from the full profile, so only that endpoint needs checking.
+        # The step 6 search is independent of it and runs alongside.
+        multi_future = self._pool.submit(self._get_json, "multi-prescriptions", token=self.doctor_token)
+        search_future = self._pool.submit(self._get_json, f"patients/search?q={self.patient_user['name']}", token=self.doctor_token)
+        success, multi_response = multi_future.result()
+        if success and isinstance(multi_response, list):
+            patient_multi_prescriptions = [p for p in multi_response if p.get("patient_id") == patient_data.get("id")]
             
-            # Check if prescription count increased (including both single and multi-prescriptions)
-            # Note: multi-prescriptions are stored separately, so we need to check multi-prescriptions endpoint
-            success, multi_response = self.make_request("GET", "multi-prescriptions", token=self.doctor_token)
-            if success and isinstance(multi_response, list):
-                patient_multi_prescriptions = [p for p in multi_response if p.get("patient_id") == patient_data.get("id")]
+            if patient_multi_prescriptions:
+                self.log_test("Workflow Step 5: Prescription Added to Patient", True)
                 
-                if patient_multi_prescriptions:
-                    self.log_test("Workflow Step 5: Prescription Added to Patient", True)
-                    
-                    # Verify the prescription contains our patient's name
-                    our_prescription = next((p for p in patient_multi_prescriptions if p.get("id") == new_prescription_id), None)
-                    if our_prescription and "patient_name" in our_prescription:
-                        self.log_test("Workflow Step 5a: Patient Name in Prescription", True)
-                    else:
-                        self.log_test("Workflow Step 5a: Patient Name in Prescription", False, "Patient name not found in prescription")
+                # Verify the prescription contains our patient's name
+                prescriptions_by_id = {p.get("id"): p for p in patient_multi_prescriptions}
+                our_prescription = prescriptions_by_id.get(new_prescription_id)
+                if our_prescription and "patient_name" in our_prescription:
+                    self.log_test("Workflow Step 5a: Patient Name in Prescription", True)
                 else:
-                    self.log_test("Workflow Step 5: Prescription Added to Patient", False, "Multi-prescription not found for patient")
+                    self.log_test("Workflow Step 5a: Patient Name in Prescription", False, "Patient name not found in prescription")
             else:
-                self.log_test("Workflow Step 5: Prescription Added to Patient", False, "Could not retrieve multi-prescriptions")
+                self.log_test("Workflow Step 5: Prescription Added to Patient", False, "Multi-prescription not found for patient")
         else:
-            self.log_test("Workflow Step 5: Verify Workflow Completion", False, "Could not retrieve updated patient profile")
+            self.log_test("Workflow Step 5: Prescription Added to Patient", False, "Could not retrieve multi-prescriptions")
 
         # Step 6: Test data consistency across the workflow
-        # Verify that patient data is consistent across different endpoints
-        success, search_response = self.make_request("GET", f"patients/search?q={self.patient_user['name']}", token=self.doctor_token)
-        success2, profile_response = self.make_request("GET", f"patients/{self.patient_user['id']}/full-profile", token=self.doctor_token)
+        # Verify that patient data is consistent across different endpoints (profile reused from step 2)
+        success, search_response = search_future.result()
+        profile_response = patient_profile
         
-        if success and success2:
-            search_patient = next((p for p in search_response if p.get("user_id") == self.patient_user["id"]), None)
+        if success:
+            patients_by_user_id = {p.get("user_id"): p for p in search_response if isinstance(p, dict)}
+            search_patient = patients_by_user_id.get(self.patient_user["id"])
             profile_patient = profile_response.get("patient_info", {})
             
             if (search_patient and profile_patient and 
@@ -1646,7 +1700,7 @@ class HealthCardAPITester:
 
     def test_authentication_security(self):
         """Test authentication and authorization"""
-        print("\n🔍 Testing Authentication Security...")
+        self._emit("\n🔍 Testing Authentication Security...")
         
         # Test accessing protected endpoint without token
         success, response = self.make_request("GET", "patients/me", expected_status=401)
@@ -1665,64 +1719,115 @@ class HealthCardAPITester:
 
         return True
 
-    def run_all_tests(self):
-        """Run complete test suite"""
-        print("🚀 Starting HealthCard ID Backend API Tests")
-        print(f"📡 Testing against: {self.base_url}")
-        print("=" * 60)
+    def _run_lane(self, test_methods):
+        """Run test methods sequentially, logging any exception as a failure"""
+        for test_method in test_methods:
+            try:
+                test_method()
+            except Exception as e:
+                self.log_test(f"{test_method.__name__}", False, f"Exception: {str(e)}")
+            finally:
+                self._flush_log()
+
+    def run_all_tests(self, concurrent_lanes=True):
+        """Run complete test suite; concurrent_lanes=False runs the lanes one after another"""
+        self._emit("🚀 Starting HealthCard ID Backend API Tests")
+        self._emit(f"📡 Testing against: {self.base_url}")
+        self._emit("=" * 60)
 
-        # Run tests in sequence
-        test_methods = [
+        # Setup tier: everything else depends on these tokens and the patient profile
+        setup_methods = [
             self.test_user_registration,
             self.test_user_login,
             self.test_patient_profile,
-            self.test_patient_search,
-            self.test_appointments_management,
-            self.test_prescriptions_management,
-            self.test_multi_medicine_prescriptions,  # Added multi-medicine prescription tests
-            self.test_patient_profile_endpoint,  # Added patient profile endpoint tests
-            self.test_integration_doctor_workflow,  # Added integration workflow tests
-            self.test_doctor_patient_portal,
-            self.test_medical_records,
-            self.test_audit_logging_system,  # Added audit logging tests
-            self.test_notification_system,  # Added notification system tests
-            self.test_notification_scheduling_system,  # Added notification scheduling tests
-            self.test_mock_email_notification_system,  # Added mock email tests
-            self.test_file_upload_system,
-            self.test_file_management,
-            self.test_file_security,
-            self.test_ai_health_summary,
-            self.test_dashboard_stats,
-            self.test_ai_chat,
-            self.test_authentication_security
         ]
 
-        for test_method in test_methods:
-            try:
-                test_method()
-            except Exception as e:
-                self.log_test(f"{test_method.__name__}", False, f"Exception: {str(e)}")
+        # Independent lanes run concurrently; tests inside a lane stay sequential.
+        # Anything that creates patient notifications (appointments, multi-medicine
+        # prescriptions, test notifications) shares a lane with the notification
+        # checks so the unread counts are not raced, and the file tests depend on
+        # the upload that starts their lane.
+        test_lanes = [
+            [
+                self.test_appointments_management,
+                self.test_multi_medicine_prescriptions,  # Added multi-medicine prescription tests
+                self.test_integration_doctor_workflow,  # Added integration workflow tests
+                self.test_audit_logging_system,  # Added audit logging tests
+                self.test_notification_system,  # Added notification system tests
+                self.test_notification_scheduling_system,  # Added notification scheduling tests
+                self.test_mock_email_notification_system,  # Added mock email tests
+            ],
+            [
+                self.test_prescriptions_management,
+                self.test_patient_profile_endpoint,  # Added patient profile endpoint tests
+                self.test_doctor_patient_portal,
+                self.test_medical_records,
+            ],
+            [
+                self.test_file_upload_system,
+                self.test_file_management,
+                self.test_file_security,
+                self.test_ai_health_summary,
+            ],
+            [
+                self.test_patient_search,
+                self.test_dashboard_stats,
+                self.test_ai_chat,
+                self.test_authentication_security,
+            ],
+        ]
+
+        try:
+            self._run_lane(setup_methods)
+            if concurrent_lanes:
+                # Lanes get their own executor: tests submit requests to self._pool and
+                # block on them, so sharing it could starve those requests of workers
+                with ThreadPoolExecutor(max_workers=len(test_lanes)) as lane_pool:
+                    list(lane_pool.map(self._run_lane, test_lanes))
+            else:
+                for lane in test_lanes:
+                    self._run_lane(lane)
+        finally:
+            self._pool.shutdown(wait=True)
+            self._session.close()
 
         # Print final results
-        print("\n" + "=" * 60)
-        print("📊 TEST RESULTS SUMMARY")
-        print("=" * 60)
-        print(f"✅ Tests Passed: {self.tests_passed}")
-        print(f"❌ Tests Failed: {self.tests_run - self.tests_passed}")
-        print(f"📈 Success Rate: {(self.tests_passed/self.tests_run)*100:.1f}%")
+        out = self._out
+        out.write("\n" + "=" * 60 + "\n")
+        out.write("📊 TEST RESULTS SUMMARY\n")
+        out.write("=" * 60 + "\n")
+        out.write(f"✅ Tests Passed: {self.tests_passed}\n")
+        out.write(f"❌ Tests Failed: {self.tests_run - self.tests_passed}\n")
+        out.write(f"📈 Success Rate: {(self.tests_passed/self.tests_run)*100:.1f}%\n")
         
         if self.tests_passed < self.tests_run:
-            print("\n❌ FAILED TESTS:")
+            out.write("\n❌ FAILED TESTS:\n")
             for result in self.test_results:
                 if not result["success"]:
-                    print(f"  • {result['name']}: {result['details']}")
+                    out.write(f"  • {result['name']}: {result['details']}\n")
 
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
         return self.tests_passed == self.tests_run
 
 def main():
     """Main test execution"""
-    tester = HealthCardAPITester()
-    success = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description="HealthCard ID backend API tests")
+    parser.add_argument("--replay", action="store_true",
+                        help="replay responses from the recorded cassette without touching the network (requires vcrpy)")
+    parser.add_argument("--record", action="store_true",
+                        help="re-record the cassette from the live backend (requires vcrpy)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="print each result as it happens instead of once per test method")
+    args = parser.parse_args()
+
+    tester = HealthCardAPITester(verbose=args.verbose)
+    if args.replay or args.record:
+        # Lanes run one after another so the replay sees requests in recorded order
+        with use_cassette(CASSETTE_PATH, record=args.record):
+            success = tester.run_all_tests(concurrent_lanes=False)
+    else:
+        success = tester.run_all_tests()
     
     if success:
         print("\n🎉 All tests passed! Backend API is working correctly.")
@@ -4,8 +4,12 @@ Focused test for datetime serialization in appointments and prescriptions
 """
 
 import requests
-import json
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
+
+from test_utils import get_shared_tokens, json_dumps
+
+# Shared keep-alive session so every call reuses the same connection
+session = requests.Session()
 
 def test_datetime_serialization():
     """Test that datetime fields are properly serialized"""
@@ -13,44 +17,19 @@ def test_datetime_serialization():
     
     print("🔍 Testing Datetime Serialization...")
     
-    # Register test users
-    timestamp = datetime.now().strftime("%H%M%S")
-    
-    # Register patient
-    patient_data = {
-        "email": f"datetime_patient_{timestamp}@test.com",
-        "password": "TestPass123!",
-        "name": f"DateTime Patient {timestamp}",
-        "role": "patient"
-    }
-    
-    response = requests.post(f"{base_url}/auth/register", json=patient_data)
-    if response.status_code != 200:
-        print(f"❌ Patient registration failed: {response.text}")
-        return False
-    
-    patient_token = response.json()["access_token"]
-    patient_user = response.json()["user"]
-    print("✅ Patient registered successfully")
-    
-    # Register doctor
-    doctor_data = {
-        "email": f"datetime_doctor_{timestamp}@test.com",
-        "password": "TestPass123!",
-        "name": f"DateTime Doctor {timestamp}",
-        "role": "doctor"
-    }
-    
-    response = requests.post(f"{base_url}/auth/register", json=doctor_data)
-    if response.status_code != 200:
-        print(f"❌ Doctor registration failed: {response.text}")
+    # Reuse the process-wide test users instead of registering a fresh pair
+    try:
+        _, doctor_token, patient_user, _ = get_shared_tokens(base_url)
+    except (RuntimeError, requests.exceptions.RequestException) as e:
+        print(f"❌ {e}")
         return False
+    print("✅ Test users registered successfully")
     
-    doctor_token = response.json()["access_token"]
-    print("✅ Doctor registered successfully")
-    
+    # Date fields are sent as date objects; json_dumps encodes them as ISO 8601 strings
+    doctor_headers = {'Authorization': f'Bearer {doctor_token}', 'Content-Type': 'application/json'}
+
     # Test appointment creation with date fields
-    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    tomorrow = date.today() + timedelta(days=1)
     appointment_data = {
         "patient_id": patient_user["id"],
         "appointment_date": tomorrow,
@@ -61,10 +40,10 @@ def test_datetime_serialization():
     }
     
     print(f"📅 Creating appointment for date: {tomorrow}")
-    response = requests.post(
+    response = session.post(
         f"{base_url}/appointments",
-        json=appointment_data,
-        headers={'Authorization': f'Bearer {doctor_token}'}
+        data=json_dumps(appointment_data),
+        headers=doctor_headers
     )
     
     if response.status_code != 200:
@@ -78,8 +57,8 @@ def test_datetime_serialization():
     print(f"   🕐 Time stored as: {appointment_response.get('appointment_time')}")
     
     # Test prescription creation with date fields
-    today = date.today().isoformat()
-    end_date = (date.today() + timedelta(days=30)).isoformat()
+    today = date.today()
+    end_date = today + timedelta(days=30)
     
     prescription_data = {
         "patient_id": patient_user["id"],
@@ -93,10 +72,10 @@ def test_datetime_serialization():
     }
     
     print(f"💊 Creating prescription with dates: {today} to {end_date}")
-    response = requests.post(
+    response = session.post(
         f"{base_url}/prescriptions",
-        json=prescription_data,
-        headers={'Authorization': f'Bearer {doctor_token}'}
+        data=json_dumps(prescription_data),
+        headers=doctor_headers
     )
     
     if response.status_code != 200:
@@ -113,7 +92,7 @@ def test_datetime_serialization():
     print("\n🔍 Testing data retrieval...")
     
     # Get appointments
-    response = requests.get(
+    response = session.get(
         f"{base_url}/appointments",
         headers={'Authorization': f'Bearer {doctor_token}'}
     )
@@ -126,7 +105,7 @@ def test_datetime_serialization():
     print(f"✅ Retrieved {len(appointments)} appointments successfully")
     
     # Get prescriptions
-    response = requests.get(
+    response = session.get(
         f"{base_url}/prescriptions",
         headers={'Authorization': f'Bearer {doctor_token}'}
     )
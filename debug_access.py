@@ -4,33 +4,32 @@ Debug the patient access restriction issue
 """
 
 import requests
-import json
+
+from test_utils import get_shared_tokens
 
 # Test the specific endpoint that's failing
 base_url = "https://bcd54ab1-eacf-4dd6-b947-589584660f93.preview.emergentagent.com"
 api_url = f"{base_url}/api"
+session = requests.Session()
 
-# Register a test patient
-patient_data = {
-    "email": "debug_patient@test.com",
-    "password": "TestPass123!",
-    "name": "Debug Patient",
-    "role": "patient"
-}
+# Reuse the shared test patient; a fixed debug email fails once it is registered
+try:
+    patient_token = get_shared_tokens(api_url)[0]
+except (RuntimeError, requests.exceptions.RequestException) as e:
+    patient_token = None
+    print(f"❌ Failed to register patient: {e}")
 
-response = requests.post(f"{api_url}/auth/register", json=patient_data)
-if response.status_code == 200:
-    patient_token = response.json()["access_token"]
+if patient_token:
     print("✅ Patient registered successfully")
     
     # Get patient profile to get patient ID
-    response = requests.get(f"{api_url}/patients/me", headers={'Authorization': f'Bearer {patient_token}'})
+    response = session.get(f"{api_url}/patients/me", headers={'Authorization': f'Bearer {patient_token}'})
     if response.status_code == 200:
         patient_id = response.json()["id"]
         print(f"✅ Patient ID: {patient_id}")
         
         # Try to access the doctor-only endpoint
-        response = requests.get(
+        response = session.get(
             f"{api_url}/audit-logs/patient/{patient_id}",
             headers={'Authorization': f'Bearer {patient_token}'}
         )
@@ -44,5 +43,3 @@ if response.status_code == 200:
             print("❌ Access restriction NOT working - patient can access doctor endpoint")
     else:
         print(f"❌ Failed to get patient profile: {response.text}")
-else:
-    print(f"❌ Failed to register patient: {response.text}")
\ No newline at end of file
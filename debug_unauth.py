@@ -7,9 +7,10 @@ import requests
 
 base_url = "https://bcd54ab1-eacf-4dd6-b947-589584660f93.preview.emergentagent.com"
 api_url = f"{base_url}/api"
+session = requests.Session()
 
 # Try to access audit-logs without authentication
-response = requests.get(f"{api_url}/audit-logs")
+response = session.get(f"{api_url}/audit-logs")
 
 print(f"📊 Status Code: {response.status_code}")
 print(f"📊 Response: {response.text}")
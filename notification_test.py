@@ -4,14 +4,30 @@ Focused Notification System Testing for HealthCard ID
 Tests all notification endpoints and functionality
 """
 
+import argparse
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
-import json
-from datetime import datetime, date, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from typing import Dict, Any, Optional
 
+from test_utils import get_shared_tokens, json_dumps, json_loads, make_user, use_cassette
+
+# Recorded backend traffic for --replay/--record runs (requires vcrpy)
+CASSETTE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "cassettes", "notifications.yaml")
+
 class NotificationTester:
-    def __init__(self, base_url="https://bcd54ab1-eacf-4dd6-b947-589584660f93.preview.emergentagent.com"):
+    _SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "DELETE"})
+    _REQUIRED_NOTIFICATION_FIELDS = ("id", "user_id", "type", "priority", "title", "message", "read", "created_at")
+    _VALID_PRIORITIES = frozenset({"low", "medium", "high", "urgent"})
+
+    def __init__(self, base_url="https://bcd54ab1-eacf-4dd6-b947-589584660f93.preview.emergentagent.com",
+                 load_users: int = 0):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.patient_token = None
@@ -20,104 +36,159 @@ class NotificationTester:
         self.doctor_user = None
         self.tests_run = 0
         self.tests_passed = 0
+        # Test methods run on worker threads: counters are locked and each thread
+        # buffers its output so a method's lines are printed together
+        self._log_lock = threading.Lock()
+        self._log_local = threading.local()
+        # Number of extra patients for the opt-in concurrent load test (0 disables it)
+        self.load_users = load_users
+        # Latest patient notification list fetched by a test, reused by content validation
+        self._patient_notifications = None
+
+        # Pooled keep-alive session; throttling and transient gateway errors are retried
+        # by the adapter with backoff, and the last response is returned once retries run out
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504],
+                      allowed_methods=self._SUPPORTED_METHODS, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Request artifacts are reused: one header dict per token and one URL per endpoint
+        self._anon_headers = {'Content-Type': 'application/json'}
+        self._headers_by_token = {}
+        self._urls = {}
+
+        # Fixed endpoints as absolute URLs; make_request passes these through unformatted
+        self.notifications_url = f"{self.api_url}/notifications"
+        self.unread_count_url = f"{self.notifications_url}/unread-count"
+        self.mark_all_read_url = f"{self.notifications_url}/mark-all-read"
+        self.test_notification_url = f"{self.notifications_url}/test"
+        self.appointments_url = f"{self.api_url}/appointments"
+
+    @property
+    def _log_buffer(self) -> list:
+        """Output lines buffered by the current thread"""
+        buffer = getattr(self._log_local, "buffer", None)
+        if buffer is None:
+            buffer = self._log_local.buffer = []
+        return buffer
+
+    def _emit(self, text: str):
+        """Queue a line of output for the current test method"""
+        self._log_buffer.append(text + "\n")
+
+    def _flush_log(self):
+        """Print this thread's buffered lines as one block"""
+        buffer = self._log_buffer
+        if buffer:
+            with self._log_lock:
+                sys.stdout.write("".join(buffer))
+                sys.stdout.flush()
+            buffer.clear()
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test results"""
-        self.tests_run += 1
+        with self._log_lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
         if success:
-            self.tests_passed += 1
-            print(f"✅ {name} - PASSED")
+            self._emit(f"✅ {name} - PASSED")
         else:
-            print(f"❌ {name} - FAILED: {details}")
+            self._emit(f"❌ {name} - FAILED: {details}")
+
+    def _headers(self, token: Optional[str]) -> Dict:
+        """Return the cached request headers for token (or the anonymous headers)"""
+        if not token:
+            return self._anon_headers
+        headers = self._headers_by_token.get(token)
+        if headers is None:
+            headers = self._headers_by_token[token] = {**self._anon_headers, 'Authorization': f'Bearer {token}'}
+        return headers
+
+    def _url(self, endpoint: str) -> str:
+        """Return the cached absolute URL for an API endpoint; absolute URLs pass through"""
+        if endpoint.startswith("http"):
+            return endpoint
+        url = self._urls.get(endpoint)
+        if url is None:
+            url = self._urls[endpoint] = f"{self.api_url}/{endpoint}"
+        return url
 
     def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                    token: Optional[str] = None, expected_status: int = 200) -> tuple[bool, Dict]:
-        """Make HTTP request and validate response"""
-        url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
-        
-        if token:
-            headers['Authorization'] = f'Bearer {token}'
+                    token: Optional[str] = None, expected_status: int = 200,
+                    headers: Optional[Dict] = None, only_status: bool = False) -> tuple[bool, Dict]:
+        """Make HTTP request and validate response; only_status skips decoding the body"""
+        url = self._url(endpoint)
+        if headers is None:
+            headers = self._headers(token)
+
+        if method not in self._SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported method: {method}")
 
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
-            else:
-                return False, {"error": f"Unsupported method: {method}"}
+            body = json_dumps(data) if data is not None else None
+            response = self.session.request(method, url, data=body, headers=headers, timeout=30)
 
             success = response.status_code == expected_status
+            if only_status:
+                return success, {"status_code": response.status_code}
+            # No Content / empty bodies have nothing to decode
+            if response.status_code == 204 or not response.content:
+                return success, {}
             
             try:
-                response_data = response.json()
+                response_data = json_loads(response.content)
             except:
                 response_data = {"raw_response": response.text, "status_code": response.status_code}
 
             return success, response_data
 
         except requests.exceptions.RequestException as e:
+            # Connection errors land here once the adapter has exhausted its retries;
+            # timeouts and other request errors fail this call without escaping it
             return False, {"error": str(e)}
 
+    def _poll(self, endpoint: str, token: Optional[str], predicate, timeout: float = 5,
+              interval: float = 0.2) -> tuple[bool, Any]:
+        """GET endpoint until predicate(response) holds or timeout elapses; returns the last result"""
+        deadline = time.monotonic() + timeout
+        while True:
+            success, response = self.make_request("GET", endpoint, token=token)
+            if (success and predicate(response)) or time.monotonic() >= deadline:
+                return success, response
+            time.sleep(interval)
+
     def setup_test_users(self):
         """Create test users for notification testing"""
         print("🔧 Setting up test users...")
         
-        # Create patient
-        timestamp = datetime.now().strftime("%H%M%S")
-        patient_data = {
-            "email": f"patient_notif_{timestamp}@test.com",
-            "password": "TestPass123!",
-            "name": f"Patient Notification {timestamp}",
-            "role": "patient"
-        }
-        
-        success, response = self.make_request("POST", "auth/register", patient_data)
-        if success and "access_token" in response:
-            self.patient_token = response["access_token"]
-            self.patient_user = response["user"]
-            self.log_test("Patient Registration", True)
-        else:
-            self.log_test("Patient Registration", False, str(response))
-            return False
-
-        # Create doctor
-        doctor_data = {
-            "email": f"doctor_notif_{timestamp}@test.com",
-            "password": "TestPass123!",
-            "name": f"Dr. Notification {timestamp}",
-            "role": "doctor",
-            "specialization": "General Medicine"
-        }
-        
-        success, response = self.make_request("POST", "auth/register", doctor_data)
-        if success and "access_token" in response:
-            self.doctor_token = response["access_token"]
-            self.doctor_user = response["user"]
-            self.log_test("Doctor Registration", True)
-        else:
-            self.log_test("Doctor Registration", False, str(response))
+        # Users are registered once per process and shared with the other scripts
+        try:
+            (self.patient_token, self.doctor_token,
+             self.patient_user, self.doctor_user) = get_shared_tokens(self.api_url)
+        except (RuntimeError, requests.exceptions.RequestException) as e:
+            self.log_test("Test User Registration", False, str(e))
             return False
 
+        self.log_test("Patient Registration", True)
+        self.log_test("Doctor Registration", True)
         return True
 
     def test_notification_endpoints(self):
         """Test all notification API endpoints"""
-        print("\n🔍 Testing Notification API Endpoints...")
+        self._emit("\n🔍 Testing Notification API Endpoints...")
         
         # Test 1: Create test notification
-        success, response = self.make_request("POST", "notifications/test", token=self.patient_token)
+        success, response = self.make_request("POST", self.test_notification_url, token=self.patient_token)
         if success and response.get("success"):
             self.log_test("POST /api/notifications/test", True)
         else:
             self.log_test("POST /api/notifications/test", False, str(response))
 
         # Test 2: Get notifications
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
+        success, response = self.make_request("GET", self.notifications_url, token=self.patient_token)
         if success and isinstance(response, list):
             self.log_test("GET /api/notifications", True)
             patient_notifications = response
@@ -126,7 +197,7 @@ class NotificationTester:
             patient_notifications = []
 
         # Test 3: Get unread count
-        success, response = self.make_request("GET", "notifications/unread-count", token=self.patient_token)
+        success, response = self.make_request("GET", self.unread_count_url, token=self.patient_token)
         if success and "unread_count" in response:
             self.log_test("GET /api/notifications/unread-count", True)
         else:
@@ -144,7 +215,7 @@ class NotificationTester:
             self.log_test("PUT /api/notifications/{id}/read", True, "No notifications to test (acceptable)")
 
         # Test 5: Mark all notifications as read
-        success, response = self.make_request("PUT", "notifications/mark-all-read", token=self.patient_token)
+        success, response = self.make_request("PUT", self.mark_all_read_url, token=self.patient_token)
         if success and response.get("success"):
             self.log_test("PUT /api/notifications/mark-all-read", True)
         else:
@@ -163,7 +234,7 @@ class NotificationTester:
 
     def test_notification_creation_on_appointment(self):
         """Test automatic notification creation when appointments are booked"""
-        print("\n🔍 Testing Notification Creation on Appointment Booking...")
+        self._emit("\n🔍 Testing Notification Creation on Appointment Booking...")
         
         # Create appointment to trigger notification
         tomorrow = (date.today() + timedelta(days=1)).isoformat()
@@ -175,24 +246,22 @@ class NotificationTester:
             "reason": "Notification test appointment"
         }
         
-        success, response = self.make_request("POST", "appointments", appointment_data, token=self.doctor_token)
+        success, response = self.make_request("POST", self.appointments_url, appointment_data, token=self.doctor_token)
         if success and "id" in response:
             appointment_id = response["id"]
             self.log_test("Appointment Creation", True)
             
-            # Wait for notification to be created
-            import time
-            time.sleep(2)
-            
-            # Check if notification was created
-            success, response = self.make_request("GET", "notifications", token=self.patient_token)
+            # Poll until the booking notification shows up rather than sleeping a fixed time
+            success, response = self._poll(
+                self.notifications_url, self.patient_token,
+                lambda r: isinstance(r, list) and any(n.get("type") == "appointment_booked" for n in r))
             if success and isinstance(response, list):
-                appointment_notifications = [n for n in response if n.get("type") == "appointment_booked"]
-                if appointment_notifications:
+                self._patient_notifications = response
+                notification = next((n for n in response if n.get("type") == "appointment_booked"), None)
+                if notification:
                     self.log_test("Automatic Notification Creation", True)
                     
                     # Verify notification content
-                    notification = appointment_notifications[0]
                     if ("appointment" in notification.get("title", "").lower() and 
                         "Dr." in notification.get("message", "")):
                         self.log_test("Notification Content Quality", True)
@@ -213,7 +282,7 @@ class NotificationTester:
 
     def test_notification_scheduling(self):
         """Test notification scheduling for appointment reminders"""
-        print("\n🔍 Testing Notification Scheduling...")
+        self._emit("\n🔍 Testing Notification Scheduling...")
         
         # Create future appointment to test reminder scheduling
         future_date = (date.today() + timedelta(days=2)).isoformat()
@@ -225,17 +294,14 @@ class NotificationTester:
             "reason": "Reminder scheduling test"
         }
         
-        success, response = self.make_request("POST", "appointments", appointment_data, token=self.doctor_token)
+        success, response = self.make_request("POST", self.appointments_url, appointment_data, token=self.doctor_token)
         if success and "id" in response:
             self.log_test("Future Appointment Creation", True)
             
-            # Wait for background task to process
-            import time
-            time.sleep(3)
-            
             # The reminder is scheduled for 24 hours before, so we can't test the actual sending
             # But we can verify the appointment creation succeeded (indicating scheduling worked)
-            success, response = self.make_request("GET", f"appointments/{response['id']}", token=self.doctor_token)
+            success, response = self._poll(f"appointments/{response['id']}", self.doctor_token,
+                                           lambda r: "id" in r)
             if success:
                 self.log_test("Appointment Reminder Scheduling", True)
             else:
@@ -245,7 +311,7 @@ class NotificationTester:
 
     def test_email_notification_mocking(self):
         """Test mock email notification system"""
-        print("\n🔍 Testing Mock Email Notification System...")
+        self._emit("\n🔍 Testing Mock Email Notification System...")
         
         # Create appointment which should trigger email notification
         tomorrow = (date.today() + timedelta(days=1)).isoformat()
@@ -257,18 +323,16 @@ class NotificationTester:
             "reason": "Email notification test"
         }
         
-        success, response = self.make_request("POST", "appointments", appointment_data, token=self.doctor_token)
+        success, response = self.make_request("POST", self.appointments_url, appointment_data, token=self.doctor_token)
         if success:
             self.log_test("Email Notification Trigger", True)
             
             # The mock email system logs to console and database
             # We can verify the system continues to work (no crashes)
-            import time
-            time.sleep(2)
-            
-            # Test that system is still responsive after email processing
-            success, response = self.make_request("GET", "notifications", token=self.patient_token)
+            success, response = self._poll(self.notifications_url, self.patient_token,
+                                           lambda r: isinstance(r, list))
             if success:
+                self._patient_notifications = response
                 self.log_test("System Stability After Email Processing", True)
             else:
                 self.log_test("System Stability After Email Processing", False, "System became unresponsive")
@@ -277,23 +341,21 @@ class NotificationTester:
 
     def test_role_based_access(self):
         """Test role-based access control for notifications"""
-        print("\n🔍 Testing Role-Based Access Control...")
+        self._emit("\n🔍 Testing Role-Based Access Control...")
         
         # Create notifications for both users
-        success, response = self.make_request("POST", "notifications/test", token=self.patient_token)
+        success, response = self.make_request("POST", self.test_notification_url, token=self.patient_token)
         if success:
-            success, response = self.make_request("POST", "notifications/test", token=self.doctor_token)
+            success, response = self.make_request("POST", self.test_notification_url, token=self.doctor_token)
             if success:
-                # Wait for notifications to be created
-                import time
-                time.sleep(1)
-                
-                # Patient should only see their notifications
-                success, response = self.make_request("GET", "notifications", token=self.patient_token)
+                # Patient should only see their notifications; poll until their own test notification is listed
+                success, response = self._poll(
+                    self.notifications_url, self.patient_token,
+                    lambda r: isinstance(r, list) and any(n.get("user_id") == self.patient_user["id"] for n in r))
                 if success and isinstance(response, list):
-                    patient_notifications = response
-                    doctor_notifications_in_patient_view = [n for n in patient_notifications 
-                                                          if n.get("user_id") == self.doctor_user["id"]]
+                    self._patient_notifications = response
+                    doctor_notifications_in_patient_view = any(n.get("user_id") == self.doctor_user["id"]
+                                                               for n in response)
                     
                     if not doctor_notifications_in_patient_view:
                         self.log_test("Patient Notification Access Control", True)
@@ -301,11 +363,10 @@ class NotificationTester:
                         self.log_test("Patient Notification Access Control", False, "Patient can see doctor notifications")
                         
                     # Doctor should only see their notifications
-                    success, response = self.make_request("GET", "notifications", token=self.doctor_token)
+                    success, response = self.make_request("GET", self.notifications_url, token=self.doctor_token)
                     if success and isinstance(response, list):
-                        doctor_notifications = response
-                        patient_notifications_in_doctor_view = [n for n in doctor_notifications 
-                                                              if n.get("user_id") == self.patient_user["id"]]
+                        patient_notifications_in_doctor_view = any(n.get("user_id") == self.patient_user["id"]
+                                                                   for n in response)
                         
                         if not patient_notifications_in_doctor_view:
                             self.log_test("Doctor Notification Access Control", True)
@@ -322,39 +383,40 @@ class NotificationTester:
 
     def test_notification_content_validation(self):
         """Test notification content includes proper details"""
-        print("\n🔍 Testing Notification Content Validation...")
+        self._emit("\n🔍 Testing Notification Content Validation...")
         
-        # Get existing notifications
-        success, response = self.make_request("GET", "notifications", token=self.patient_token)
-        if success and isinstance(response, list) and response:
-            notifications = response
-            
+        # Reuse the list the earlier tests already fetched; only GET if none of them succeeded
+        notifications = self._patient_notifications
+        if notifications is None:
+            success, response = self.make_request("GET", self.notifications_url, token=self.patient_token)
+            notifications = response if success and isinstance(response, list) else []
+
+        if notifications:
             # Test notification structure
-            notification = notifications[0]
-            required_fields = ["id", "user_id", "type", "priority", "title", "message", "read", "created_at"]
-            missing_fields = [field for field in required_fields if field not in notification]
+            missing_fields = [field for field in self._REQUIRED_NOTIFICATION_FIELDS if field not in notifications[0]]
             
             if not missing_fields:
                 self.log_test("Notification Structure Validation", True)
             else:
                 self.log_test("Notification Structure Validation", False, f"Missing fields: {missing_fields}")
             
-            # Test content quality
-            meaningful_notifications = [n for n in notifications 
-                                     if (n.get("title") and len(n["title"]) > 5 and 
-                                         n.get("message") and len(n["message"]) > 10)]
+            # Content quality and priority levels are checked in a single pass over the list
+            meaningful_count = 0
+            valid_priority_count = 0
+            for n in notifications:
+                title = n.get("title")
+                message = n.get("message")
+                if title and len(title) > 5 and message and len(message) > 10:
+                    meaningful_count += 1
+                if n.get("priority") in self._VALID_PRIORITIES:
+                    valid_priority_count += 1
             
-            if meaningful_notifications:
+            if meaningful_count:
                 self.log_test("Notification Content Quality", True)
             else:
                 self.log_test("Notification Content Quality", False, "Notifications lack meaningful content")
             
-            # Test priority levels
-            valid_priorities = ["low", "medium", "high", "urgent"]
-            valid_priority_notifications = [n for n in notifications 
-                                          if n.get("priority") in valid_priorities]
-            
-            if valid_priority_notifications:
+            if valid_priority_count:
                 self.log_test("Notification Priority Validation", True)
             else:
                 self.log_test("Notification Priority Validation", False, "Invalid priority levels")
@@ -363,7 +425,7 @@ class NotificationTester:
 
     def test_authentication_protection(self):
         """Test authentication protection for notification endpoints"""
-        print("\n🔍 Testing Authentication Protection...")
+        self._emit("\n🔍 Testing Authentication Protection...")
         
         # Test unauthorized access
         endpoints_to_test = [
@@ -373,40 +435,99 @@ class NotificationTester:
             ("PUT", "notifications/mark-all-read")
         ]
         
-        for method, endpoint in endpoints_to_test:
-            success, response = self.make_request(method, endpoint, expected_status=401)
+        # The probes are independent, so issue them together over the pooled session
+        # and log the results afterwards in the original order
+        with ThreadPoolExecutor(max_workers=len(endpoints_to_test)) as pool:
+            results = list(pool.map(lambda probe: self.make_request(*probe, expected_status=401,
+                                                                      only_status=True),
+                                    endpoints_to_test))
+
+        for (method, endpoint), (success, response) in zip(endpoints_to_test, results):
             if not success:  # Should fail with 401
                 self.log_test(f"Unauthorized Access Protection - {method} {endpoint}", True)
             else:
                 self.log_test(f"Unauthorized Access Protection - {method} {endpoint}", False, "Should require authentication")
 
-    def run_all_tests(self):
-        """Run complete notification system test suite"""
+    def _load_user_roundtrip(self, index: int) -> Optional[str]:
+        """Register a fresh patient, raise a test notification and read it back; returns an error or None"""
+        success, response = self.make_request("POST", "auth/register", make_user("patient", f"load{index}"))
+        if not (success and "access_token" in response):
+            return f"registration failed: {response}"
+        token = response["access_token"]
+
+        success, response = self.make_request("POST", self.test_notification_url, token=token)
+        if not (success and response.get("success")):
+            return f"test notification failed: {response}"
+
+        success, response = self._poll(self.notifications_url, token, lambda r: isinstance(r, list) and bool(r))
+        if not (success and isinstance(response, list) and response):
+            return "test notification not listed"
+        return None
+
+    def test_concurrent_users(self):
+        """Exercise the notification endpoints for many patients at once"""
+        self._emit(f"\n🔍 Testing Notifications With {self.load_users} Concurrent Users...")
+
+        # Worker threads share the pooled session; its adapter holds up to 16 connections
+        with ThreadPoolExecutor(max_workers=min(self.load_users, 16)) as pool:
+            errors = list(pool.map(self._load_user_roundtrip, range(self.load_users)))
+
+        failures = [f"user {i}: {error}" for i, error in enumerate(errors) if error]
+        if not failures:
+            self.log_test(f"Concurrent Notification Round Trips ({self.load_users} users)", True)
+        else:
+            self.log_test(f"Concurrent Notification Round Trips ({self.load_users} users)", False,
+                          f"{len(failures)} failed, first: {failures[0]}")
+
+    def _run_test_method(self, test_method):
+        """Run one test method, logging any exception as a failure, then flush its output"""
+        try:
+            test_method()
+        except Exception as e:
+            self.log_test(f"{test_method.__name__}", False, f"Exception: {str(e)}")
+        finally:
+            self._flush_log()
+
+    def run_all_tests(self, concurrent=True):
+        """Run complete notification system test suite; concurrent=False runs the parallel group in order"""
         print("🚀 Starting HealthCard ID Notification System Tests")
         print(f"📡 Testing against: {self.base_url}")
         print("=" * 70)
 
         # Setup test users
-        if not self.setup_test_users():
+        setup_ok = self.setup_test_users()
+        self._flush_log()
+        if not setup_ok:
             print("❌ Failed to setup test users. Aborting tests.")
             return False
 
-        # Run notification tests
-        test_methods = [
+        # These tests only share the patient's notification list, and none of them
+        # asserts on counts another test changes, so they run concurrently
+        parallel_methods = [
             self.test_notification_endpoints,
+            self.test_role_based_access,
+            self.test_authentication_protection
+        ]
+        # These book appointments for the same patient, so they stay in order (otherwise
+        # another test's booking notification could satisfy the creation check);
+        # content validation then checks the latest notification snapshot
+        sequential_methods = [
             self.test_notification_creation_on_appointment,
             self.test_notification_scheduling,
             self.test_email_notification_mocking,
-            self.test_role_based_access,
-            self.test_notification_content_validation,
-            self.test_authentication_protection
+            self.test_notification_content_validation
         ]
+        if self.load_users:
+            sequential_methods.append(self.test_concurrent_users)
 
-        for test_method in test_methods:
-            try:
-                test_method()
-            except Exception as e:
-                self.log_test(f"{test_method.__name__}", False, f"Exception: {str(e)}")
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=len(parallel_methods)) as pool:
+                list(pool.map(self._run_test_method, parallel_methods))
+        else:
+            for test_method in parallel_methods:
+                self._run_test_method(test_method)
+        for test_method in sequential_methods:
+            self._run_test_method(test_method)
 
         # Print final results
         print("\n" + "=" * 70)
@@ -418,10 +539,32 @@ class NotificationTester:
 
         return self.tests_passed == self.tests_run
 
+def _non_negative_int(value):
+    """argparse type for counts: an int >= 0"""
+    count = int(value)
+    if count < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {count}")
+    return count
+
+
 def main():
     """Main test execution"""
-    tester = NotificationTester()
-    success = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description="HealthCard ID notification system tests")
+    parser.add_argument("--load-users", type=_non_negative_int, default=0, metavar="N",
+                        help="also run the notification round trip for N freshly registered patients concurrently")
+    parser.add_argument("--replay", action="store_true",
+                        help="replay responses from the recorded cassette without touching the network (requires vcrpy)")
+    parser.add_argument("--record", action="store_true",
+                        help="re-record the cassette from the live backend (requires vcrpy)")
+    args = parser.parse_args()
+
+    tester = NotificationTester(load_users=args.load_users)
+    if args.replay or args.record:
+        # The parallel tests run one after another so the replay sees requests in recorded order
+        with use_cassette(CASSETTE_PATH, record=args.record):
+            success = tester.run_all_tests(concurrent=False)
+    else:
+        success = tester.run_all_tests()
     
     if success:
         print("\n🎉 All notification tests passed! Notification system is working correctly.")
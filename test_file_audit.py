@@ -3,68 +3,177 @@
 Test file upload audit logging
 """
 
+import argparse
 import requests
-import io
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from test_utils import json_loads, make_user
 
 base_url = "https://bcd54ab1-eacf-4dd6-b947-589584660f93.preview.emergentagent.com"
 api_url = f"{base_url}/api"
 
-# Register a test patient
-patient_data = {
-    "email": "file_audit_patient@test.com",
-    "password": "TestPass123!",
-    "name": "File Audit Patient",
-    "role": "patient"
-}
-
-response = requests.post(f"{api_url}/auth/register", json=patient_data)
-if response.status_code == 200:
-    patient_token = response.json()["access_token"]
-    print("✅ Patient registered successfully")
-    
-    # Create a test PDF file
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\nxref\n0 4\n0000000000 65535 f \n0000000009 00000 n \n0000000074 00000 n \n0000000120 00000 n \ntrailer\n<<\n/Size 4\n/Root 1 0 R\n>>\nstartxref\n179\n%%EOF"
-    
-    # Upload file
-    files = {'file': ('audit_test_report.pdf', io.BytesIO(pdf_content), 'application/pdf')}
-    response = requests.post(
-        f"{api_url}/upload/medical-report",
-        files=files,
-        headers={'Authorization': f'Bearer {patient_token}'}
-    )
-    
-    if response.status_code == 200:
-        print("✅ File uploaded successfully")
-        
-        # Wait a moment for audit log to be created
-        import time
-        time.sleep(2)
-        
-        # Check audit logs for file upload
-        response = requests.get(
-            f"{api_url}/audit-logs",
-            headers={'Authorization': f'Bearer {patient_token}'}
-        )
-        
-        if response.status_code == 200:
-            audit_logs = response.json()
-            file_upload_logs = [log for log in audit_logs if log.get("resource_type") == "file_upload"]
-            
-            if file_upload_logs:
-                print("✅ File upload audit log found")
-                log = file_upload_logs[0]
-                print(f"   📝 Description: {log.get('description')}")
-                print(f"   📝 User: {log.get('user_name')} ({log.get('user_role')})")
-                print(f"   📝 Action: {log.get('action')}")
-                print(f"   📝 New values: {log.get('new_values', {}).keys()}")
-            else:
-                print("❌ No file upload audit log found")
-                print(f"   📊 Found {len(audit_logs)} total audit logs")
-                resource_types = [log.get("resource_type") for log in audit_logs]
-                print(f"   📊 Resource types: {set(resource_types)}")
-        else:
-            print(f"❌ Failed to get audit logs: {response.text}")
-    else:
-        print(f"❌ File upload failed: {response.text}")
-else:
-    print(f"❌ Failed to register patient: {response.text}")
\ No newline at end of file
+# Minimal one-page PDF uploaded by every patient; immutable, so shared across workers
+PDF_BYTES = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\nxref\n0 4\n0000000000 65535 f \n0000000009 00000 n \n0000000074 00000 n \n0000000120 00000 n \ntrailer\n<<\n/Size 4\n/Root 1 0 R\n>>\nstartxref\n179\n%%EOF"
+
+
+@dataclass(slots=True, frozen=True)
+class AuditLog:
+    """The audit log fields this test reports on; any the server omits are None"""
+    resource_type: Optional[str] = None
+    description: Optional[str] = None
+    user_name: Optional[str] = None
+    user_role: Optional[str] = None
+    action: Optional[str] = None
+    new_values: Optional[dict] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in _AUDIT_LOG_FIELDS})
+
+
+_AUDIT_LOG_FIELDS = tuple(field.name for field in fields(AuditLog))
+
+
+class ApiSession(requests.Session):
+    """Session that resolves relative request paths against a base URL
+
+    Requests without an explicit timeout get the session's, so a stalled
+    server fails the call instead of hanging the worker.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        super().__init__()
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        if not url.startswith("http"):
+            url = self.base_url + url
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+# Upper bound on concurrent patients; also the size of the shared connection pool
+MAX_WORKERS = 16
+
+# One adapter (and so one urllib3 pool) shared by every worker session: the host is
+# resolved and TLS negotiated once per pooled connection instead of once per patient.
+# Transient gateway errors are retried with backoff.
+_ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS,
+                       max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]))
+
+
+def new_session():
+    """API session for one worker; headers are per session, connections come from the shared pool"""
+    session = ApiSession(api_url)
+    session.mount("http://", _ADAPTER)
+    session.mount("https://", _ADAPTER)
+    return session
+
+
+def run_one_patient(i):
+    """Register patient i, upload a report and check its audit log; returns (passed, report lines)"""
+    lines = []
+    # Each worker has its own session, reused across its own calls
+    session = new_session()
+
+    # Calls raise on an error status, exhausted retries, timeouts or a malformed
+    # body; the failing step's message is reported and only this patient fails
+    failure = "❌ Failed to register patient"
+    try:
+        # Register a test patient
+        response = session.post("/auth/register", json=make_user("patient", f"file_audit{i}"))
+        response.raise_for_status()
+        # Every later call is authenticated, so the bearer header lives on the session
+        session.headers['Authorization'] = f'Bearer {response.json()["access_token"]}'
+        lines.append("✅ Patient registered successfully")
+
+        # Upload file
+        failure = "❌ File upload failed"
+        files = {'file': ('audit_test_report.pdf', PDF_BYTES, 'application/pdf')}
+        session.post("/upload/medical-report", files=files).raise_for_status()
+        lines.append("✅ File uploaded successfully")
+
+        failure = "❌ Failed to get audit logs"
+        return check_upload_audit_log(session, lines), lines
+    except requests.HTTPError as e:
+        lines.append(f"{failure}: {e.response.text}")
+    except (requests.RequestException, ValueError, KeyError) as e:
+        lines.append(f"{failure}: {e!r}")
+    return False, lines
+
+
+def check_upload_audit_log(session, lines):
+    """Poll for the upload's audit log and report it into lines; returns whether it was found"""
+    # Poll (up to the old 2s wait) until the upload's audit log has been written.
+    # The server filters by resource_type, so each poll returns at most one row.
+    audit_logs = None
+    upload_log = None
+    deadline = time.monotonic() + 2.0
+    while True:
+        response = session.get("/audit-logs", params={"resource_type": "file_upload", "limit": 1})
+        if response.ok:
+            audit_logs = [AuditLog.from_dict(log) for log in json_loads(response.content)]
+            upload_log = next((log for log in audit_logs if log.resource_type == "file_upload"), None)
+        if upload_log is not None or time.monotonic() >= deadline:
+            break
+        time.sleep(0.1)
+
+    if audit_logs is None:
+        lines.append(f"❌ Failed to get audit logs: {response.text}")
+        return False
+
+    if upload_log is not None:
+        lines.append("✅ File upload audit log found")
+        log = upload_log
+        lines.append(f"   📝 Description: {log.description}")
+        lines.append(f"   📝 User: {log.user_name} ({log.user_role})")
+        lines.append(f"   📝 Action: {log.action}")
+        lines.append(f"   📝 New values: {(log.new_values or {}).keys()}")
+        return True
+
+    lines.append("❌ No file upload audit log found")
+    # Only the failure report needs the unfiltered list
+    response = session.get("/audit-logs")
+    all_logs = [AuditLog.from_dict(log) for log in json_loads(response.content)] if response.ok else []
+    lines.append(f"   📊 Found {len(all_logs)} total audit logs")
+    resource_types = [log.resource_type for log in all_logs]
+    lines.append(f"   📊 Resource types: {set(resource_types)}")
+    return False
+
+
+def _positive_int(value):
+    """argparse type for the patient count: an int >= 1"""
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {count}")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HealthCard ID file upload audit log test")
+    parser.add_argument("patients", nargs="?", type=_positive_int, default=1, metavar="N",
+                        help="number of patients to run the check for concurrently (default: 1)")
+    patients = parser.parse_args().patients
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        results = list(ex.map(run_one_patient, range(patients)))
+
+    # Each patient's report is emitted as one block, and the whole run in a single write
+    report = []
+    for i, (passed, lines) in enumerate(results):
+        if patients > 1:
+            report.append(f"\n👤 Patient {i}")
+        report.extend(lines)
+
+    if patients > 1:
+        report.append(f"\n📊 {sum(passed for passed, _ in results)}/{patients} patients passed")
+
+    sys.stdout.write("\n".join(report) + "\n")
+    sys.stdout.flush()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the HealthCard ID test scripts
+"""
+
+import json
+from datetime import date, datetime, time, timezone
+from functools import lru_cache, partial
+
+import requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ISOEncoder(json.JSONEncoder):
+    """Stdlib encoder matching json_dumps: ISO 8601 dates/times, naive datetimes as UTC with a Z suffix"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            if o.tzinfo is None:
+                o = o.replace(tzinfo=timezone.utc)
+            return o.isoformat().replace("+00:00", "Z")
+        if isinstance(o, (date, time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+# Request bodies may carry date/datetime/time values directly; both encoders emit ISO 8601
+if orjson is not None:
+    json_dumps = partial(orjson.dumps, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+    json_loads = orjson.loads
+else:
+    def json_dumps(obj):
+        return json.dumps(obj, cls=ISOEncoder).encode()
+    json_loads = json.loads
+
+# Per-process suffix for test identities; microseconds keep parallel runs from colliding
+_TS = datetime.now().strftime("%H%M%S%f")
+
+
+def make_user(role: str, tag: str = "") -> dict:
+    """Build a registration payload for role; tag must differ between users of one process"""
+    label = f"{tag}_{role}" if tag else role
+    user = {
+        "email": f"{label}_{_TS}@test.com",
+        "password": "TestPass123!",
+        "name": f"{'Dr.' if role == 'doctor' else 'Test'} {label.replace('_', ' ').title()} {_TS}",
+        "role": role
+    }
+    if role == "doctor":
+        user["specialization"] = "General Medicine"
+    return user
+
+
+@lru_cache(maxsize=1)
+def get_shared_tokens(api_url: str) -> tuple[str, str, dict, dict]:
+    """Register one patient and one doctor per process and reuse them across scripts
+
+    Returns (patient_token, doctor_token, patient_user, doctor_user). Raises
+    RuntimeError if either registration fails.
+    """
+    users = {"patient": make_user("patient", "shared"), "doctor": make_user("doctor", "shared")}
+
+    registered = {}
+    with requests.Session() as session:
+        for role, user_data in users.items():
+            response = session.post(f"{api_url}/auth/register", json=user_data, timeout=30)
+            if response.status_code != 200:
+                raise RuntimeError(f"{role.capitalize()} registration failed: {response.text}")
+            registered[role] = response.json()
+
+    return (registered["patient"]["access_token"], registered["doctor"]["access_token"],
+            registered["patient"]["user"], registered["doctor"]["user"])
+
+
+def _match_authorization(r1, r2):
+    """vcrpy matcher: the same method + URL answers differently per caller"""
+    assert r1.headers.get("Authorization") == r2.headers.get("Authorization")
+
+
+def use_cassette(path: str, record: bool = False):
+    """vcrpy cassette for the --record/--replay runs of the test scripts
+
+    Requests match on method, URL and Authorization header; bodies are not
+    matched because registration payloads carry per-run timestamps, and the
+    replayed registrations hand back the recorded tokens. Recording
+    overwrites the cassette; replay never reaches the network, so a request
+    the cassette lacks fails instead of hitting the live backend.
+    """
+    import vcr
+
+    recorder = vcr.VCR(decode_compressed_response=True)
+    recorder.register_matcher("authorization", _match_authorization)
+    return recorder.use_cassette(
+        path,
+        record_mode="all" if record else "none",
+        match_on=["method", "scheme", "host", "path", "query", "authorization"],
+    )